@@ -1,7 +1,18 @@
 # backend/app/routes/stock_routes.py
-from flask import Blueprint, request, jsonify, make_response
-from app import db, get_current_price
-from models import User, Stock, Transaction, Portfolio
+from flask import Blueprint, request, jsonify, make_response, Response, stream_with_context
+import base64
+import json
+from datetime import datetime, timedelta
+import numpy as np
+from sqlalchemy import select, tuple_
+from app import (db, catalog_snapshot, get_current_price, get_current_prices, leaderboard, redis_client,
+                 stock_catalog, stock_search)
+from app.services.candles import INTERVALS, MAX_BARS, get_candles
+from app.services.orders import cancel_order, parse_pending_order, place_order, serialize_order
+from app.services.pnl import get_user_pnl
+from app.services.search import MAX_RESULTS as MAX_SEARCH_RESULTS
+from app.services.trading import MAX_BATCH_ORDERS, OrderRejected, execute_batch, execute_order, parse_order
+from models import User, Transaction, Portfolio, PendingOrder
 
 stock_routes = Blueprint("stock_routes", __name__)
 
@@ -30,10 +41,13 @@ def trade_stock():
             return jsonify({"error": f"Missing required fields: {', '.join(required_fields)}"}), 400
 
         user_id = data['user_id']
-        stock_id = data['stock_id']
-        transaction_type = data['transaction_type'].lower()
-        units = data['units']
-        price = round(float(get_current_price(stock_id)),2)
+        # Same checks as batch orders: known transaction type, positive integer units.
+        try:
+            stock_id, transaction_type, units = parse_order(data)
+        except OrderRejected as e:
+            return jsonify({"error": str(e)}), 400
+        # Execution price must not come from a possibly stale cache entry.
+        price = round(float(get_current_price(stock_id, fresh=True)),2)
 
         # Validate the user
         user = User.query.filter_by(username=user_id).first()
@@ -41,67 +55,16 @@ def trade_stock():
             return jsonify({"error": "User not found"}), 404
 
         # Validate the stock
-        stock = Stock.query.filter_by(symbol=stock_id).first()
+        stock = stock_catalog.get_by_symbol(stock_id)
         if not stock:
             return jsonify({"error": "Stock not found"}), 404
-        
-        # Validate transaction type
-        if transaction_type not in ['buy', 'sell']:
-            return jsonify({"error": "Invalid transaction type. Must be 'buy' or 'sell'"}), 400
-        # Handle 'buy' transaction
-        if transaction_type == 'buy':
-            # Add the transaction to the Transactions table
-            transaction = Transaction(
-                user_id=user.id,
-                stock_id=stock.id,
-                transaction_type='buy',
-                units=units,
-                price=price
-            )
-            db.session.add(transaction)
-
-            # Update the user's portfolio
-            portfolio_entry = Portfolio.query.filter_by(user_id=user.id, stock_id=stock.id).first()
-            if portfolio_entry:
-                # If the stock already exists in the portfolio, update it
-                total_cost = portfolio_entry.units * portfolio_entry.average_buy_price
-                total_cost += units * price
-                portfolio_entry.units += units
-                portfolio_entry.average_buy_price = total_cost / portfolio_entry.units
-            else:
-                # If the stock is not in the portfolio, create a new entry
-                portfolio_entry = Portfolio(
-                    user_id=user.id,
-                    stock_id=stock.id,
-                    units=units,
-                    average_buy_price=price
-                )
-                db.session.add(portfolio_entry)
-
-        # Handle 'sell' transaction
-        elif transaction_type == 'sell':
-            # Check if the stock exists in the user's portfolio
-            portfolio_entry = Portfolio.query.filter_by(user_id=user.id, stock_id=stock.id).first()
-            if not portfolio_entry or portfolio_entry.units < units:
-                return jsonify({"error": "Insufficient stock units in the portfolio to sell"}), 400
-
-            # Add the transaction to the Transactions table
-            transaction = Transaction(
-                user_id=user.id,
-                stock_id=stock.id,
-                transaction_type='sell',
-                units=units,
-                price=price
-            )
-            db.session.add(transaction)
-
-            # Update the portfolio
-            portfolio_entry.units -= units
-            if portfolio_entry.units == 0:
-                db.session.delete(portfolio_entry)  # Remove entry if no units left
-
-        # Commit changes to the database
-        db.session.commit()
+
+        # Update the holding atomically and record the transaction in one short DB transaction.
+        try:
+            execute_order(user, stock, transaction_type, units, price)
+        except OrderRejected as e:
+            db.session.rollback()
+            return jsonify({"error": str(e)}), 400
 
         return jsonify({"message": f"Stock {transaction_type} transaction completed successfully"}), 201
 
@@ -111,6 +74,110 @@ def trade_stock():
         return jsonify({"error": "An error occurred while processing the transaction", "details": str(e)}), 500
 
 
+@stock_routes.route('/trade_batch', methods=['POST'])
+def trade_batch():
+    """
+    Executes a basket of buy/sell market orders for one user in one DB transaction.
+    Expects JSON input with user_id and orders: [{stock_id, transaction_type, units}, ...].
+    Returns a result per order; rejected orders do not block the others.
+    """
+    try:
+        data = request.get_json()
+        if not data or 'user_id' not in data or 'orders' not in data:
+            return jsonify({"error": "Missing required fields: user_id, orders"}), 400
+        orders = data['orders']
+        if not isinstance(orders, list) or not orders:
+            return jsonify({"error": "orders must be a non-empty list"}), 400
+        if len(orders) > MAX_BATCH_ORDERS:
+            return jsonify({"error": f"At most {MAX_BATCH_ORDERS} orders per batch"}), 400
+
+        # Validate the user
+        user = User.query.filter_by(username=data['user_id']).first()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+
+        results = execute_batch(user, orders)
+        filled = sum(1 for result in results if result["status"] == "filled")
+        return jsonify({
+            "message": f"{filled} of {len(results)} orders filled",
+            "results": results
+        }), 201 if filled else 200
+
+    except Exception as e:
+        # Rollback in case of an error
+        db.session.rollback()
+        return jsonify({"error": "An error occurred while processing the batch", "details": str(e)}), 500
+
+
+@stock_routes.route('/orders', methods=['POST'])
+def create_order():
+    """
+    Places a resting limit or stop order, filled when a tick crosses trigger_price.
+    Expects JSON input with user_id, stock_id, transaction_type (buy/sell),
+    order_type (limit/stop), units and trigger_price.
+    """
+    try:
+        data = request.get_json()
+        if not data or 'user_id' not in data:
+            return jsonify({"error": "Missing required fields: user_id"}), 400
+        try:
+            symbol, transaction_type, order_type, units, trigger_price = parse_pending_order(data)
+        except OrderRejected as e:
+            return jsonify({"error": str(e)}), 400
+
+        user = User.query.filter_by(username=data['user_id']).first()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        stock = stock_catalog.get_by_symbol(symbol)
+        if not stock:
+            return jsonify({"error": "Stock not found"}), 404
+
+        order = place_order(user, stock, transaction_type, order_type, units, trigger_price)
+        return jsonify({"order": serialize_order(order, stock.symbol)}), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "An error occurred while placing the order", "details": str(e)}), 500
+
+
+@stock_routes.route('/orders', methods=['GET'])
+def list_orders():
+    """
+    Lists a user's limit/stop orders, newest first. Optional status filter
+    (open, filled, cancelled, rejected).
+    """
+    user_id = request.args.get('user_id')
+    status = request.args.get('status')
+    try:
+        user = User.query.filter_by(username=user_id).first()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        query = PendingOrder.query.filter_by(user_id=user.id)
+        if status:
+            query = query.filter_by(status=status)
+        orders = query.order_by(PendingOrder.created_at.desc(), PendingOrder.id.desc()).limit(500).all()
+        return jsonify({"orders": [serialize_order(o, stock_catalog.symbol_for(o.stock_id)) for o in orders]}), 200
+    except Exception as e:
+        return jsonify({"error": "An error occurred while fetching orders", "details": str(e)}), 500
+
+
+@stock_routes.route('/orders/<int:order_id>/cancel', methods=['POST'])
+def cancel_pending_order(order_id):
+    """
+    Cancels an open limit/stop order. Expects JSON input with user_id.
+    """
+    try:
+        data = request.get_json() or {}
+        user = User.query.filter_by(username=data.get('user_id')).first()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+        if not cancel_order(user, order_id):
+            return jsonify({"error": "Order not found or no longer open"}), 409
+        return jsonify({"message": "Order cancelled", "order_id": order_id}), 200
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"error": "An error occurred while cancelling the order", "details": str(e)}), 500
+
+
 @stock_routes.route('/get_portfolio', methods=['GET'])
 def get_portfolio():
     """
@@ -136,7 +203,7 @@ def get_portfolio():
 
         portfolio_data = [
             {
-                "stock_id": Stock.query.get(entry.stock_id).symbol,
+                "stock_id": stock_catalog.symbol_for(entry.stock_id),
                 "units": entry.units,
                 "average_buy_price": entry.average_buy_price,
             } for entry in portfolio
@@ -147,30 +214,288 @@ def get_portfolio():
         return jsonify({"error": "An error occurred while fetching the portfolio", "details": str(e)}), 500
 
 
-@stock_routes.route('/get_stocks', methods=['GET'])
-def get_stocks():
+@stock_routes.route('/portfolio_value', methods=['GET'])
+def portfolio_value():
     """
-    Fetch all available stocks.
+    Marks a user's portfolio to market: per-position market value and
+    unrealized P&L plus portfolio totals. Holdings come from one SQL query and
+    prices from one HMGET, whatever the number of positions.
     """
+    user_id = request.args.get('user_id')
     try:
-        stocks = Stock.query.all()
-        stocks_data = [
+        holdings = (db.session.query(Portfolio.stock_id, Portfolio.units, Portfolio.average_buy_price)
+                    .join(User, Portfolio.user_id == User.id)
+                    .filter(User.username == user_id)
+                    .all())
+
+        if not holdings:
+            # Only now pay for telling "unknown user" apart from "no holdings".
+            if not User.query.filter_by(username=user_id).first():
+                return jsonify({"error": "User not found"}), 404
+            return jsonify({"error": "No portfolio found for the user"}), 404
+
+        # Holdings of stocks no longer in the catalog have no symbol to price;
+        # leave them out, like the leaderboard rebuild does.
+        symbols = [stock_catalog.symbol_for(row.stock_id) for row in holdings]
+        holdings = [row for row, symbol in zip(holdings, symbols) if symbol is not None]
+        symbols = [symbol for symbol in symbols if symbol is not None]
+        if not holdings:
+            return jsonify({"error": "No portfolio found for the user"}), 404
+        prices = get_current_prices(symbols)
+
+        units = np.array([row.units for row in holdings], dtype=float)
+        avg_price = np.array([row.average_buy_price for row in holdings], dtype=float)
+        # Symbols without a live price yet become NaN and are left out of the totals.
+        ltp = np.array([np.nan if p == "Loading..." else float(p) for p in prices])
+        cost = units * avg_price
+        market_value = units * ltp
+        pnl = market_value - cost
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pnl_pct = np.where(cost != 0, pnl / cost * 100, np.nan)
+
+        def _num(value):
+            return None if np.isnan(value) else round(float(value), 2)
+
+        positions = [
             {
-                "id": stock.id,
-                "symbol": stock.symbol,
-                "name": stock.name,
-                "price": 105006.0  # Placeholder for current price, replace with real-time data if available
-            } for stock in stocks
+                "stock_id": symbols[i],
+                "units": int(units[i]),
+                "average_buy_price": float(avg_price[i]),
+                "current_price": _num(ltp[i]),
+                "cost_basis": _num(cost[i]),
+                "market_value": _num(market_value[i]),
+                "unrealized_pnl": _num(pnl[i]),
+                "unrealized_pnl_pct": _num(pnl_pct[i]),
+            } for i in range(len(holdings))
         ]
-        return jsonify({"stocks": stocks_data}), 200
+
+        priced = ~np.isnan(ltp)
+        total_cost = float(cost[priced].sum())
+        total_value = float(market_value[priced].sum())
+        totals = {
+            "cost_basis": round(total_cost, 2),
+            "market_value": round(total_value, 2),
+            "unrealized_pnl": round(total_value - total_cost, 2),
+            "unrealized_pnl_pct": round((total_value - total_cost) / total_cost * 100, 2) if total_cost else None,
+            "unpriced_positions": int((~priced).sum()),
+        }
+
+        return jsonify({"portfolio": positions, "totals": totals}), 200
+    except Exception as e:
+        return jsonify({"error": "An error occurred while valuing the portfolio", "details": str(e)}), 500
+
+
+@stock_routes.route('/pnl', methods=['GET'])
+def pnl():
+    """
+    FIFO realized P&L per stock from pnl_summary, plus unrealized P&L of the
+    open lots at live prices. Nothing is replayed from the transactions table.
+    """
+    user_id = request.args.get('user_id')
+    try:
+        user = User.query.filter_by(username=user_id).first()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+
+        rows = get_user_pnl(user.id)
+        symbols = [stock_catalog.symbol_for(row.stock_id) for row in rows]
+        # Stocks no longer in the catalog have no symbol to price; their
+        # realized P&L still counts, they are just left unpriced.
+        priced_symbols = [symbol for symbol in symbols if symbol is not None]
+        price_by_symbol = dict(zip(priced_symbols, get_current_prices(priced_symbols)))
+        prices = [price_by_symbol.get(symbol, "Loading...") for symbol in symbols]
+
+        open_units = np.array([row.open_units for row in rows], dtype=float)
+        open_cost = np.array([row.open_cost for row in rows], dtype=float)
+        realized = np.array([row.realized for row in rows], dtype=float)
+        ltp = np.array([np.nan if p == "Loading..." else float(p) for p in prices])
+        # Closed-out positions have nothing left to mark.
+        unrealized = np.where(open_units == 0, 0.0, open_units * ltp - open_cost)
+
+        def _num(value):
+            return None if np.isnan(value) else round(float(value), 2)
+
+        positions = [
+            {
+                "stock_id": symbols[i],
+                "realized_pnl": _num(realized[i]),
+                "open_units": int(open_units[i]),
+                "open_cost": _num(open_cost[i]),
+                "average_open_price": _num(open_cost[i] / open_units[i]) if open_units[i] else None,
+                "current_price": _num(ltp[i]),
+                "unrealized_pnl": _num(unrealized[i]),
+            } for i in range(len(rows))
+        ]
+
+        priced = ~np.isnan(unrealized)
+        totals = {
+            "realized_pnl": round(float(realized.sum()), 2),
+            "unrealized_pnl": round(float(unrealized[priced].sum()), 2),
+            "unpriced_positions": int((~priced).sum()),
+        }
+        return jsonify({"pnl": positions, "totals": totals}), 200
+    except Exception as e:
+        return jsonify({"error": "An error occurred while fetching P&L", "details": str(e)}), 500
+
+
+MAX_LEADERBOARD_LIMIT = 100
+
+
+@stock_routes.route('/leaderboard', methods=['GET'])
+def get_leaderboard():
+    """
+    Top users by portfolio value, platform-wide or among one master's child
+    accounts (?master_id=). Served from a Redis sorted set kept current by
+    trades and ticks.
+    """
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), MAX_LEADERBOARD_LIMIT)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    try:
+        return jsonify({"leaderboard": leaderboard.top(limit, request.args.get('master_id'))}), 200
+    except Exception as e:
+        return jsonify({"error": "An error occurred while fetching the leaderboard", "details": str(e)}), 500
+
+
+@stock_routes.route('/leaderboard/rank', methods=['GET'])
+def get_leaderboard_rank():
+    """
+    A user's rank and portfolio value, platform-wide or within ?master_id=.
+    """
+    user_id = request.args.get('user_id')
+    if not user_id:
+        return jsonify({"error": "Missing required fields: user_id"}), 400
+    try:
+        rank = leaderboard.rank(user_id, request.args.get('master_id'))
+        if rank is None:
+            return jsonify({"error": "User not ranked"}), 404
+        return jsonify(rank), 200
+    except Exception as e:
+        return jsonify({"error": "An error occurred while fetching the rank", "details": str(e)}), 500
+
+
+@stock_routes.route('/search', methods=['GET'])
+def search_stocks():
+    """
+    Typeahead search over symbols and names (?q=, ?limit=), best match first,
+    with live prices. Served from the in-memory index; no database access.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"error": "q is required"}), 400
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), MAX_SEARCH_RESULTS)
+    except ValueError:
+        return jsonify({"error": "limit must be an integer"}), 400
+    try:
+        matches = stock_search.search(query, limit)
+        prices = get_current_prices([entry.symbol for entry, _ in matches])
+        results = [
+            {
+                "id": entry.id,
+                "stock_id": entry.stock_id,
+                "symbol": entry.symbol,
+                "name": entry.name,
+                "score": score,
+                "price": price,
+            } for (entry, score), price in zip(matches, prices)
+        ]
+        return jsonify({"query": query, "results": results}), 200
+    except Exception as e:
+        return jsonify({"error": "An error occurred while searching stocks", "details": str(e)}), 500
+
+
+# Clients reuse the stock list this long, then revalidate it with If-None-Match.
+STOCKS_MAX_AGE = 300
+MAX_PRICE_SYMBOLS = 5000
+
+
+@stock_routes.route('/get_stocks', methods=['GET'])
+def get_stocks():
+    """
+    Fetch all available stocks (without prices; see /get_prices). The body is
+    pre-rendered per catalog change and served with an ETag, as a 304 when
+    the client's copy is current and gzipped when the client accepts it.
+    """
+    try:
+        snapshot = catalog_snapshot.get()
+        # The gzipped body is a different representation, so it gets its own tag.
+        gzipped = request.accept_encodings['gzip'] > 0
+        etag = f"{snapshot.etag}-gz" if gzipped else snapshot.etag
+        if request.if_none_match.contains_weak(etag):
+            response = Response(status=304)
+        elif gzipped:
+            response = Response(snapshot.gzip_body, content_type='application/json')
+            response.headers['Content-Encoding'] = 'gzip'
+        else:
+            response = Response(snapshot.body, content_type='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = f'public, max-age={STOCKS_MAX_AGE}'
+        response.headers['Vary'] = 'Accept-Encoding'
+        return response
     except Exception as e:
         return jsonify({"error": "An error occurred while fetching stocks", "details": str(e)}), 500
 
 
+@stock_routes.route('/get_prices', methods=['GET'])
+def get_prices():
+    """
+    Live prices keyed by symbol, for ?symbols=A,B,... or the whole catalog,
+    read with one HMGET on current_data. Symbols without a price yet are left
+    out. "version" is the /get_stocks ETag the symbol list was taken from.
+    """
+    snapshot = catalog_snapshot.get()
+    symbols = request.args.get('symbols')
+    symbols = [s for s in symbols.split(',') if s] if symbols else snapshot.symbols
+    if len(symbols) > MAX_PRICE_SYMBOLS and symbols is not snapshot.symbols:
+        return jsonify({"error": f"At most {MAX_PRICE_SYMBOLS} symbols per request"}), 400
+    try:
+        prices = redis_client.hmget("current_data", symbols) if symbols else []
+        return jsonify({
+            "version": snapshot.etag,
+            "prices": {symbol: float(price) for symbol, price in zip(symbols, prices) if price is not None},
+        }), 200
+    except Exception as e:
+        return jsonify({"error": "An error occurred while fetching prices", "details": str(e)}), 500
+
+
+TRANSACTIONS_PAGE_MAX = 500
+TRANSACTIONS_STREAM_BATCH = 1000
+
+
+def _encode_cursor(created_at, txn_id):
+    raw = f"{created_at.isoformat()}|{txn_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    created_at, txn_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(created_at), int(txn_id)
+
+
+def _serialize_transaction(row):
+    return {
+        "transaction_id": row.id,
+        "symbol": stock_catalog.symbol_for(row.stock_id),  # Get stock symbol instead of stock_id
+        "transaction_type": row.transaction_type,
+        "units": row.units,
+        "price": row.price,
+        "created_at": row.created_at.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+
 @stock_routes.route('/get_transactions', methods=['GET'])
 def get_transactions():
     """
-    Fetches all transactions for a given user.
+    Fetches transactions for a given user, newest first.
+    Optional query parameters:
+      - symbol: only transactions for this stock
+      - from / to: ISO date or datetime bounds (a bare date for `to` includes that whole day)
+      - limit / cursor: keyset pagination on (created_at, id); the response carries
+        next_cursor until the last page
+      - stream=true: stream every matching row from a server-side cursor
+    Without limit, cursor or stream the full (filtered) history is returned.
     """
     if request.method == 'OPTIONS':
         response = make_response()
@@ -180,34 +505,110 @@ def get_transactions():
         return response, 200
     
     user_id = request.args.get('user_id')
+    symbol = request.args.get('symbol')
+    cursor = request.args.get('cursor')
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes')
+    try:
+        limit = request.args.get('limit')
+        limit = min(int(limit), TRANSACTIONS_PAGE_MAX) if limit else None
+        if limit is not None and limit <= 0:
+            raise ValueError("limit must be positive")
+        date_from = request.args.get('from')
+        date_from = datetime.fromisoformat(date_from) if date_from else None
+        date_to = request.args.get('to')
+        if date_to:
+            date_to_exclusive = len(date_to) == 10
+            date_to = datetime.fromisoformat(date_to) + (timedelta(days=1) if date_to_exclusive else timedelta(0))
+        cursor = _decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        return jsonify({"error": "Invalid query parameters", "details": str(e)}), 400
+
+    if cursor and limit is None:
+        limit = TRANSACTIONS_PAGE_MAX
+
     try:
         # Validate if user exists
         user = User.query.filter_by(username=user_id).first()
         if not user:
             return jsonify({"error": "User not found"}), 404
-        print(user.id)
-        # Fetch all transactions for the user
-        transactions = (db.session.query(Transaction, Stock.symbol)
-                        .join(Stock, Transaction.stock_id == Stock.id)
-                        .filter(Transaction.user_id == user.id)
-                        .order_by(Transaction.created_at.desc())
-                        .all())
+
+        # Select plain columns so streamed rows are not kept in the ORM identity map.
+        query = (select(Transaction.id, Transaction.stock_id, Transaction.transaction_type,
+                        Transaction.units, Transaction.price, Transaction.created_at)
+                 .where(Transaction.user_id == user.id)
+                 .order_by(Transaction.created_at.desc(), Transaction.id.desc()))
+        if symbol:
+            stock_pk = stock_catalog.id_for(symbol)
+            if stock_pk is None:
+                return jsonify({"error": "Stock not found"}), 404
+            query = query.where(Transaction.stock_id == stock_pk)
+        if date_from:
+            query = query.where(Transaction.created_at >= date_from)
+        if date_to:
+            if date_to_exclusive:
+                query = query.where(Transaction.created_at < date_to)
+            else:
+                query = query.where(Transaction.created_at <= date_to)
+        if cursor:
+            query = query.where(tuple_(Transaction.created_at, Transaction.id) < cursor)
+
+        if stream:
+            def generate():
+                rows = db.session.execute(
+                    query.execution_options(yield_per=TRANSACTIONS_STREAM_BATCH))
+                yield '{"transactions": ['
+                first = True
+                for row in rows:
+                    yield ('' if first else ',') + json.dumps(_serialize_transaction(row))
+                    first = False
+                yield ']}'
+            return Response(stream_with_context(generate()), content_type='application/json')
+
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists.
+            rows = db.session.execute(query.limit(limit + 1)).all()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id) if has_more else None
+            return jsonify({
+                "transactions": [_serialize_transaction(row) for row in rows],
+                "next_cursor": next_cursor
+            }), 200
+
+        transactions = db.session.execute(query).all()
 
         if not transactions:
             return jsonify({"error": "No transactions found for the user"}), 404
-        
-        transactions_data = [
-            {
-                "transaction_id": txn.Transaction.id,
-                "symbol": txn.symbol,  # Get stock symbol instead of stock_id
-                "transaction_type": txn.Transaction.transaction_type,
-                "units": txn.Transaction.units,
-                "price": txn.Transaction.price,
-                "created_at": txn.Transaction.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            } for txn in transactions
-        ]
+
+        transactions_data = [_serialize_transaction(txn) for txn in transactions]
 
         return jsonify({"transactions": transactions_data}), 200
     
     except Exception as e:
         return jsonify({"error": "An error occurred while fetching transactions", "details": str(e)}), 500
+
+
+@stock_routes.route('/candles', methods=['GET'])
+def candles():
+    """
+    Returns OHLCV bars for a symbol, e.g. /candles?symbol=RELIANCE&interval=5m.
+    Bars are rolled up by the ingest path, so this is a single Redis round-trip.
+    """
+    symbol = request.args.get('symbol')
+    interval = request.args.get('interval', '1m')
+    if not symbol:
+        return jsonify({"error": "Missing required parameter: symbol"}), 400
+    if interval not in INTERVALS:
+        return jsonify({"error": f"Invalid interval. Must be one of: {', '.join(INTERVALS)}"}), 400
+    try:
+        limit = min(int(request.args.get('limit', MAX_BARS)), MAX_BARS)
+        if limit <= 0:
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "limit must be a positive integer"}), 400
+
+    try:
+        bars = get_candles(redis_client, symbol, interval, limit)
+        return jsonify({"symbol": symbol, "interval": interval, "candles": bars}), 200
+    except Exception as e:
+        return jsonify({"error": "An error occurred while fetching candles", "details": str(e)}), 500
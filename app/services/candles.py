@@ -0,0 +1,133 @@
+# backend/app/services/candles.py
+"""
+Tick history and incrementally rolled-up OHLCV candles.
+
+Every trade tick is appended to a capped Redis stream per symbol
+(ticks:{symbol}). Candles are rolled up in memory by the ingest thread as
+ticks arrive and written out on each flush:
+  - candles:{interval}:{symbol}  list of closed bars, oldest first, capped
+  - candles:open:{interval}      hash of symbol -> bar currently being built
+Bars are compact JSON arrays: [start_epoch, open, high, low, close, volume].
+"""
+import json
+from datetime import datetime, timedelta, timezone
+
+INTERVALS = {"1m": 60, "5m": 300, "15m": 900}
+MAX_BARS = 500
+MAX_TICKS = 10000
+
+# TrueData timestamps are exchange (IST) wall-clock times without an offset.
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def parse_tick_time(value, default):
+    """
+    Convert a TrueData timestamp to epoch seconds, falling back to default.
+    """
+    try:
+        ts = datetime.fromisoformat(value)
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=IST)
+        return ts.timestamp()
+    except (TypeError, ValueError):
+        return default
+
+
+class CandleAggregator:
+    def __init__(self, max_bars=MAX_BARS, max_ticks=MAX_TICKS):
+        self.max_bars = max_bars
+        self.max_ticks = max_ticks
+        self._open = {}      # (interval, symbol) -> [start, o, h, l, c, v]
+        self._last_closed = {}  # (interval, symbol) -> start of the last closed bar
+        self._dirty = set()  # keys of open bars changed since the last flush
+        self._closed = []    # (interval, symbol, bar) waiting to be written
+        self._ticks = []     # (symbol, ts, price, volume) waiting to be written
+
+    def add_tick(self, symbol, ts, price, volume=0):
+        self._ticks.append((symbol, ts, price, volume))
+        for interval, seconds in INTERVALS.items():
+            key = (interval, symbol)
+            start = int(ts // seconds * seconds)
+            bar = self._open.get(key)
+            if bar is None and start <= self._last_closed.get(key, -1):
+                continue  # Late tick for a bar that roll() already closed.
+            if bar is None or start > bar[0]:
+                if bar is not None:
+                    self._close(key, bar)
+                self._open[key] = [start, price, price, price, price, volume]
+            elif start == bar[0]:
+                if price > bar[2]:
+                    bar[2] = price
+                if price < bar[3]:
+                    bar[3] = price
+                bar[4] = price
+                bar[5] += volume
+            else:
+                # Out-of-order tick for a bar that is already closed; drop it.
+                continue
+            self._dirty.add(key)
+
+    def _close(self, key, bar):
+        self._closed.append((key[0], key[1], bar))
+        self._last_closed[key] = bar[0]
+
+    def roll(self, now):
+        """
+        Close bars whose interval has ended, even if no later tick arrived.
+        """
+        for key, bar in list(self._open.items()):
+            if bar[0] + INTERVALS[key[0]] <= now:
+                self._close(key, bar)
+                del self._open[key]
+                self._dirty.discard(key)
+
+    def has_pending(self):
+        return bool(self._ticks or self._dirty or self._closed)
+
+    def flush(self, pipe):
+        """
+        Queue all pending writes on the given Redis pipeline. They stay pending
+        until commit() is called after the pipeline has executed, so a failed
+        write is retried on the next flush.
+        """
+        for symbol, ts, price, volume in self._ticks:
+            pipe.xadd(f"ticks:{symbol}", {"t": int(ts * 1000), "p": price, "v": volume},
+                      maxlen=self.max_ticks, approximate=True)
+        for interval, symbol, bar in self._closed:
+            key = f"candles:{interval}:{symbol}"
+            pipe.rpush(key, json.dumps(bar))
+            pipe.ltrim(key, -self.max_bars, -1)
+        open_bars = {}
+        for interval, symbol in self._dirty:
+            open_bars.setdefault(interval, {})[symbol] = json.dumps(self._open[(interval, symbol)])
+        for interval, mapping in open_bars.items():
+            pipe.hset(f"candles:open:{interval}", mapping=mapping)
+
+    def commit(self):
+        """
+        Drop the writes queued by the last flush(); call once they reached Redis.
+        """
+        self._ticks = []
+        self._closed = []
+        self._dirty = set()
+
+
+def get_candles(redis_client, symbol, interval, limit=MAX_BARS):
+    """
+    Return up to `limit` most recent bars (oldest first), including the open one.
+    """
+    pipe = redis_client.pipeline(transaction=False)
+    pipe.lrange(f"candles:{interval}:{symbol}", -limit, -1)
+    pipe.hget(f"candles:open:{interval}", symbol)
+    closed, current = pipe.execute()
+    bars = [json.loads(bar) for bar in closed]
+    if current:
+        current = json.loads(current)
+        # The open bar may already have been closed and pushed by a later flush.
+        if not bars or bars[-1][0] < current[0]:
+            bars.append(current)
+    bars = bars[-limit:]
+    return [
+        {"time": t, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for t, o, h, l, c, v in bars
+    ]
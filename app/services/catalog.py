@@ -0,0 +1,141 @@
+# backend/app/services/catalog.py
+"""
+Process-local, read-mostly cache of the stocks table.
+
+The catalog is loaded once at startup and answers symbol -> id and id -> symbol
+lookups without touching the database. Any ORM commit that inserts, updates or
+deletes a Stock invalidates it in this process and, through Redis pub/sub, in
+every other worker. Bulk query.update()/delete() calls bypass the ORM events,
+so call invalidate_everywhere() after those.
+
+Reloads, and the listeners' rebuilds (search index, /get_stocks body), run on
+the scheduler thread (start_refresh), never in a request: within a second of
+an invalidation, and every refresh interval in case a message was lost.
+Lookups keep using the previous maps until the new ones are swapped in.
+"""
+import json
+import threading
+from collections import namedtuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from models import Stock
+
+CATALOG_CHANNEL = "catalog_updates"
+RELOAD_CHECK_SECONDS = 1
+
+# Detached, immutable copy of a Stock row, safe to share across requests.
+CatalogEntry = namedtuple("CatalogEntry", ["id", "stock_id", "symbol", "name"])
+
+
+class StockCatalog:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (by_symbol, by_id), replaced as one object so a lookup never mixes loads.
+        self._maps = ({}, {})
+        self._stale = True
+        self._listeners = []
+        self.version = 0
+
+    def load(self):
+        """
+        (Re)load every Stock row. Requires an application context.
+        """
+        # Cleared first, so an invalidation that arrives mid-load is not lost.
+        self._stale = False
+        try:
+            entries = [
+                CatalogEntry(stock.id, stock.stock_id, stock.symbol, stock.name)
+                for stock in Stock.query.order_by(Stock.id).all()
+            ]
+        except Exception:
+            self._stale = True
+            raise
+        # The periodic refresh usually finds nothing new; keep the version and
+        # skip the listeners (index rebuilds) when so.
+        if self.version and entries == list(self._maps[1].values()):
+            return
+        with self._lock:
+            self._maps = ({entry.symbol: entry for entry in entries}, {entry.id: entry for entry in entries})
+            self.version += 1
+        for listener in self._listeners:
+            listener(entries)
+        print(f"Stock catalog loaded: {len(entries)} stocks (version {self.version})")
+
+    def invalidate(self):
+        """
+        Mark the catalog stale; the catalog-reload job reloads it.
+        """
+        self._stale = True
+
+    def add_listener(self, listener):
+        """
+        Register a callback invoked with the entry list after every load that
+        changed the catalog.
+        """
+        self._listeners.append(listener)
+
+    def start_refresh(self, app, scheduler, interval):
+        scheduler.every(RELOAD_CHECK_SECONDS, lambda: self._reload(app, only_if_stale=True), "catalog-reload")
+        scheduler.every(interval, lambda: self._reload(app), "catalog-refresh", delay=interval)
+
+    def _reload(self, app, only_if_stale=False):
+        if only_if_stale and not self._stale:
+            return
+        with app.app_context():
+            self.load()
+
+    def ensure_loaded(self):
+        # Only the first load can happen on a caller's thread (processes that
+        # do not load at startup); later ones come from start_refresh().
+        if not self.version:
+            self.load()
+
+    def get_by_symbol(self, symbol):
+        self.ensure_loaded()
+        return self._maps[0].get(symbol)
+
+    def get_by_id(self, stock_pk):
+        self.ensure_loaded()
+        return self._maps[1].get(stock_pk)
+
+    def id_for(self, symbol):
+        entry = self.get_by_symbol(symbol)
+        return entry.id if entry else None
+
+    def symbol_for(self, stock_pk):
+        entry = self.get_by_id(stock_pk)
+        return entry.symbol if entry else None
+
+    def entries(self):
+        self.ensure_loaded()
+        return list(self._maps[1].values())
+
+
+def install_invalidation(catalog, redis_client, fanout):
+    """
+    Invalidate the catalog whenever a commit touched the stocks table, and
+    propagate that to the other workers over the shared pub/sub listener.
+    """
+    def invalidate_everywhere():
+        catalog.invalidate()
+        redis_client.publish(CATALOG_CHANNEL, json.dumps({"version": catalog.version}))
+
+    @event.listens_for(Session, "after_flush")
+    def _track_stock_changes(session, flush_context):
+        changed = session.new | session.dirty | session.deleted
+        if any(isinstance(obj, Stock) for obj in changed):
+            session.info["stock_catalog_dirty"] = True
+
+    @event.listens_for(Session, "after_commit")
+    def _invalidate_on_commit(session):
+        if session.info.pop("stock_catalog_dirty", False):
+            invalidate_everywhere()
+
+    @event.listens_for(Session, "after_rollback")
+    def _discard_on_rollback(session):
+        session.info.pop("stock_catalog_dirty", None)
+
+    fanout.add_handler(CATALOG_CHANNEL, lambda payload: catalog.invalidate())
+    return invalidate_everywhere
@@ -0,0 +1,50 @@
+# backend/app/services/catalog_snapshot.py
+"""
+Pre-rendered /get_stocks response body.
+
+The stock list changes every few days while prices change every second, so
+the list is served on its own, rendered once per catalog change instead of per
+request: the JSON body, its gzip encoding and an ETag derived from the content.
+The ETag is a content hash rather than StockCatalog.version, which is a
+per-process load counter, so every worker hands out the same tag for the same
+list and a client's If-None-Match is honoured whichever worker answers.
+
+Prices are not part of the body; clients fetch them separately (/get_prices).
+"""
+import gzip
+import hashlib
+import json
+from collections import namedtuple
+
+Snapshot = namedtuple("Snapshot", ["etag", "body", "gzip_body", "symbols"])
+
+
+def render(entries):
+    stocks = [
+        {"id": entry.id, "stock_id": entry.stock_id, "symbol": entry.symbol, "name": entry.name}
+        for entry in entries
+    ]
+    stocks_json = json.dumps(stocks, separators=(",", ":"))
+    etag = hashlib.sha1(stocks_json.encode()).hexdigest()[:20]
+    body = f'{{"version":"{etag}","stocks":{stocks_json}}}'.encode()
+    # mtime=0 keeps the compressed bytes identical across workers too.
+    return Snapshot(etag, body, gzip.compress(body, compresslevel=9, mtime=0),
+                    [entry.symbol for entry in entries])
+
+
+class CatalogSnapshot:
+    """
+    Holds the current Snapshot; register rebuild() as a catalog listener.
+    """
+
+    def __init__(self):
+        self._snapshot = render([])
+
+    def rebuild(self, entries):
+        # One attribute swap, so readers never see a mixed body/etag pair.
+        self._snapshot = render(entries)
+        print(f"Catalog snapshot rendered: {len(entries)} stocks, "
+              f"{len(self._snapshot.body)} bytes ({len(self._snapshot.gzip_body)} gzipped)")
+
+    def get(self):
+        return self._snapshot
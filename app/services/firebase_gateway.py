@@ -0,0 +1,99 @@
+# backend/app/services/firebase_gateway.py
+"""
+The Firebase Auth / Firestore side effects of creating users.
+
+Every call is idempotent, so background jobs can retry them safely:
+  - auth users are imported with a caller-chosen uid and a bcrypt hash
+    (re-importing the same uid overwrites it)
+  - Firestore documents are written with set()
+  - children are added with ArrayUnion in a merge set(), which needs no read
+
+LocalFirebaseGateway is an in-memory stand-in with the same interface, used
+when FIREBASE_EMULATE is set (local development, tests, benchmarks).
+"""
+import json
+import os
+import threading
+
+FIRESTORE_BATCH_LIMIT = 500
+AUTH_IMPORT_LIMIT = 1000
+
+
+def _chunks(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+class FirebaseGateway:
+    def __init__(self, credentials_path):
+        import firebase_admin
+        from firebase_admin import auth, credentials, firestore
+
+        with open(credentials_path, "r") as f:
+            firebase_credentials = json.load(f)
+        cred = credentials.Certificate(firebase_credentials)
+        firebase_admin.initialize_app(cred)
+        self._auth = auth
+        self._firestore = firestore
+        self._db = firestore.client()
+
+    def import_users(self, users):
+        """
+        users: list of {"uid", "email", "password_hash"} with bcrypt hashes.
+        """
+        for chunk in _chunks(users, AUTH_IMPORT_LIMIT):
+            records = [
+                self._auth.ImportUserRecord(uid=u["uid"], email=u["email"],
+                                            password_hash=u["password_hash"].encode())
+                for u in chunk
+            ]
+            result = self._auth.import_users(records, hash_alg=self._auth.UserImportHash.bcrypt())
+            if result.failure_count:
+                reasons = "; ".join(f"{chunk[err.index]['email']}: {err.reason}" for err in result.errors)
+                raise RuntimeError(f"Failed to import {result.failure_count} auth users: {reasons}")
+
+    def set_user_documents(self, documents):
+        for chunk in _chunks(documents, FIRESTORE_BATCH_LIMIT):
+            batch = self._db.batch()
+            for doc in chunk:
+                batch.set(self._db.collection('users').document(doc['user_id']), doc)
+            batch.commit()
+
+    def add_children(self, master_id, child_ids):
+        relationships_ref = self._db.collection('relationships').document(master_id)
+        for chunk in _chunks(child_ids, FIRESTORE_BATCH_LIMIT):
+            relationships_ref.set({
+                'children': self._firestore.ArrayUnion([{'userId': child} for child in chunk])
+            }, merge=True)
+
+
+class LocalFirebaseGateway:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.auth_users = {}
+        self.users = {}
+        self.relationships = {}
+
+    def import_users(self, users):
+        with self._lock:
+            for u in users:
+                self.auth_users[u["uid"]] = dict(u)
+
+    def set_user_documents(self, documents):
+        with self._lock:
+            for doc in documents:
+                self.users[doc['user_id']] = dict(doc)
+
+    def add_children(self, master_id, child_ids):
+        with self._lock:
+            children = self.relationships.setdefault(master_id, [])
+            for child in child_ids:
+                if {'userId': child} not in children:
+                    children.append({'userId': child})
+
+
+def make_firebase_gateway():
+    if os.getenv("FIREBASE_EMULATE", "").lower() in ("1", "true", "yes"):
+        print("Using local in-memory Firebase stand-in")
+        return LocalFirebaseGateway()
+    return FirebaseGateway(os.getenv("FIREBASE_CREDENTIALS_PATH"))
@@ -0,0 +1,210 @@
+# backend/app/services/jobs.py
+"""
+Small Redis-backed background job queue with retries and status polling.
+
+    job:{id}                          hash with status, kind, payload, state, attempts, error
+    jobs:{queue}                      list of ready job ids
+    jobs:{queue}:delayed              sorted set of job ids waiting for a retry, by due time
+    jobs:{queue}:workers              set of worker ids
+    jobs:{queue}:worker:{worker}      heartbeat, expires when the worker dies
+    jobs:{queue}:processing:{worker}  job ids the worker has taken but not finished
+
+Handlers are called as handler(payload, state). `state` is a dict persisted
+between attempts, so a handler can record finished steps and resume after a
+failure instead of repeating them. The payload is saved back too, so a
+handler may replace secrets in it once they have been used.
+
+A worker takes a job by moving it from the ready list to its own processing
+list (BLMOVE) and removes it from there only once the attempt is recorded. If
+the process dies mid-job, the entry stays behind; once the dead worker's
+heartbeat has expired, the next worker to look requeues it. A job can thus run
+more than once (e.g. if it outlives the heartbeat), so handlers must be
+idempotent, as the state/resume design already assumes.
+"""
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+
+JOB_TTL_SECONDS = 7 * 24 * 3600
+HEARTBEAT_SECONDS = 60
+RECOVER_SECONDS = 30
+
+
+class JobQueue:
+    def __init__(self, redis_client, name="default", max_attempts=5, backoff=2.0):
+        self._redis = redis_client
+        self.name = name
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._handlers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stopping = threading.Event()
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @property
+    def _ready_key(self):
+        return f"jobs:{self.name}"
+
+    @property
+    def _delayed_key(self):
+        return f"jobs:{self.name}:delayed"
+
+    @property
+    def _workers_key(self):
+        return f"jobs:{self.name}:workers"
+
+    def _heartbeat_key(self, worker_id):
+        return f"jobs:{self.name}:worker:{worker_id}"
+
+    def _processing_key(self, worker_id):
+        return f"jobs:{self.name}:processing:{worker_id}"
+
+    def register(self, kind, handler):
+        self._handlers[kind] = handler
+
+    def enqueue(self, kind, payload):
+        job_id = uuid.uuid4().hex
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(f"job:{job_id}", mapping={
+            "kind": kind,
+            "status": "queued",
+            "payload": json.dumps(payload),
+            "state": "{}",
+            "attempts": 0,
+            "created_at": time.time(),
+        })
+        pipe.expire(f"job:{job_id}", JOB_TTL_SECONDS)
+        pipe.lpush(self._ready_key, job_id)
+        pipe.execute()
+        return job_id
+
+    def status(self, job_id):
+        job = self._redis.hgetall(f"job:{job_id}")
+        if not job:
+            return None
+        return {
+            "job_id": job_id,
+            "kind": job.get("kind"),
+            "status": job.get("status"),
+            "attempts": int(job.get("attempts", 0)),
+            "state": json.loads(job.get("state") or "{}"),
+            "error": job.get("error"),
+        }
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._heartbeat()
+                self.recover()
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        """
+        Stop after the current job; jobs still queued are left for other workers.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._stopping.set()
+            thread.join()
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.delete(self._heartbeat_key(self.worker_id))
+            pipe.srem(self._workers_key, self.worker_id)
+            pipe.execute()
+
+    def _heartbeat(self):
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.sadd(self._workers_key, self.worker_id)
+        pipe.set(self._heartbeat_key(self.worker_id), time.time(), ex=HEARTBEAT_SECONDS)
+        pipe.execute()
+
+    def recover(self):
+        """
+        Requeue jobs left in the processing lists of dead workers (and any
+        left in this worker's own list by an error between jobs).
+        Returns the number of jobs requeued.
+        """
+        requeued = 0
+        for worker_id in self._redis.smembers(self._workers_key):
+            own = worker_id == self.worker_id
+            if not own and self._redis.exists(self._heartbeat_key(worker_id)):
+                continue
+            # LMOVE is atomic, so two workers recovering at once never requeue a job twice.
+            while True:
+                job_id = self._redis.lmove(self._processing_key(worker_id), self._ready_key, "RIGHT", "LEFT")
+                if job_id is None:
+                    break
+                if self._redis.exists(f"job:{job_id}"):
+                    self._redis.hset(f"job:{job_id}", "status", "queued")
+                requeued += 1
+            if not own:
+                self._redis.srem(self._workers_key, worker_id)
+        if requeued:
+            print(f"Job queue {self.name}: requeued {requeued} unfinished jobs")
+        return requeued
+
+    def _promote_due(self):
+        now = time.time()
+        for job_id in self._redis.zrangebyscore(self._delayed_key, 0, now):
+            # Only the worker that removes it from the delayed set requeues it.
+            if self._redis.zrem(self._delayed_key, job_id):
+                self._redis.lpush(self._ready_key, job_id)
+
+    def _work(self):
+        processing_key = self._processing_key(self.worker_id)
+        last_recover = time.monotonic()
+        while not self._stopping.is_set():
+            try:
+                self._heartbeat()
+                if time.monotonic() - last_recover >= RECOVER_SECONDS:
+                    self.recover()
+                    last_recover = time.monotonic()
+                self._promote_due()
+                job_id = self._redis.blmove(self._ready_key, processing_key, 1, "RIGHT", "LEFT")
+                if job_id:
+                    self._run(job_id)
+                    # Ack: the attempt's outcome is recorded.
+                    self._redis.lrem(processing_key, 1, job_id)
+            except Exception as e:
+                print("Error in job worker:", e)
+                time.sleep(1)
+
+    def _run(self, job_id):
+        key = f"job:{job_id}"
+        job = self._redis.hgetall(key)
+        if not job:
+            return
+        handler = self._handlers.get(job["kind"])
+        attempts = int(job.get("attempts", 0)) + 1
+        payload = json.loads(job["payload"])
+        state = json.loads(job.get("state") or "{}")
+        self._redis.hset(key, mapping={"status": "running", "attempts": attempts})
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler for job kind {job['kind']}")
+            handler(payload, state)
+        except Exception as e:
+            failed = attempts >= self.max_attempts
+            self._redis.hset(key, mapping={
+                "status": "failed" if failed else "retrying",
+                "payload": json.dumps(payload),
+                "state": json.dumps(state),
+                "error": str(e),
+            })
+            print(f"Job {job_id} ({job['kind']}) attempt {attempts} failed:", e)
+            if not failed:
+                due = time.time() + self.backoff ** attempts
+                self._redis.zadd(self._delayed_key, {job_id: due})
+            return
+        self._redis.hset(key, mapping={
+            "status": "done",
+            "payload": json.dumps(payload),
+            "state": json.dumps(state),
+            "error": "",
+        })
@@ -0,0 +1,79 @@
+# backend/app/services/leader.py
+"""
+Redis-lock leader election, used so exactly one process per deployment
+runs market-data ingest.
+
+The leader holds `key` with a TTL and renews it every ttl/3. If it dies or
+loses Redis, the key expires and another candidate takes over within about
+one TTL. A leader that fails to renew steps down before its lock can expire.
+"""
+import os
+import socket
+import threading
+import uuid
+
+# Only extend/delete the lock if we still own it.
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaderElection:
+    def __init__(self, redis_client, key, on_elected, on_demoted, ttl=15.0):
+        self._redis = redis_client
+        self.key = key
+        self.ttl = ttl
+        self.on_elected = on_elected
+        self.on_demoted = on_demoted
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.is_leader = False
+        self._renew = redis_client.register_script(_RENEW_SCRIPT)
+        self._release = redis_client.register_script(_RELEASE_SCRIPT)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._campaign, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self.is_leader:
+            self._step_down()
+            try:
+                self._release(keys=[self.key], args=[self.token])
+            except Exception as e:
+                print("Error releasing leadership:", e)
+
+    def _step_down(self):
+        self.is_leader = False
+        print(f"Lost leadership of {self.key} ({self.token})")
+        self.on_demoted()
+
+    def _campaign(self):
+        ttl_ms = int(self.ttl * 1000)
+        while not self._stop.is_set():
+            try:
+                if self.is_leader:
+                    if not self._renew(keys=[self.key], args=[self.token, ttl_ms]):
+                        self._step_down()
+                elif self._redis.set(self.key, self.token, nx=True, px=ttl_ms):
+                    self.is_leader = True
+                    print(f"Elected leader of {self.key} ({self.token})")
+                    self.on_elected()
+            except Exception as e:
+                print("Error in leader election:", e)
+                if self.is_leader:
+                    # Can't prove we still hold the lock; stop before it can expire.
+                    self._step_down()
+            self._stop.wait(self.ttl / 3)
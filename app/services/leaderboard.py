@@ -0,0 +1,244 @@
+# backend/app/services/leaderboard.py
+"""
+Live leaderboard of users ranked by the market value of their holdings.
+
+Redis keys:
+  leaderboard:all               zset  username -> portfolio value
+  leaderboard:master:{master}   zset  same, for one master's child accounts
+  leaderboard:prices            hash  symbol -> price the scores are based on
+  holders:{symbol}              hash  username -> units held
+  user:master                   hash  username -> master id (set at registration)
+
+Scores change incrementally, each through a Lua script so it is atomic
+with respect to the others:
+  - a trade adds units_delta * scored price to the trader
+  - a price move adds units * (new - old) to every holder of that symbol
+    only, found through holders:{symbol}
+Top-N and rank lookups are then ZREVRANGE/ZREVRANK, O(log n).
+
+Ticks are coalesced per symbol and applied once a second by the ingest
+leader. A periodic rebuild from the portfolio table corrects any drift
+(e.g. a trade committed while Redis was unreachable).
+"""
+import threading
+
+from sqlalchemy import select
+
+from app import db
+from models import Portfolio, User
+
+LEADERBOARD_KEY = "leaderboard:all"
+MASTER_LEADERBOARD_KEY = "leaderboard:master:{}"
+SCORED_PRICES_KEY = "leaderboard:prices"
+HOLDERS_KEY = "holders:{}"
+USER_MASTER_KEY = "user:master"
+RESCORE_SECONDS = 1
+REBUILD_SECONDS = 600
+
+# Master boards are addressed from inside the scripts, which is fine on a
+# single Redis (not on Redis Cluster).
+_TRADE_SCRIPT = """
+local price = tonumber(redis.call('hget', KEYS[2], ARGV[1]))
+if not price then
+    price = tonumber(ARGV[4])
+    redis.call('hset', KEYS[2], ARGV[1], ARGV[4])
+end
+local units = redis.call('hincrby', KEYS[1], ARGV[2], ARGV[3])
+if units <= 0 then
+    redis.call('hdel', KEYS[1], ARGV[2])
+end
+local change = tonumber(ARGV[3]) * price
+redis.call('zincrby', KEYS[3], change, ARGV[2])
+local master = redis.call('hget', KEYS[4], ARGV[2])
+if master then
+    redis.call('zincrby', 'leaderboard:master:' .. master, change, ARGV[2])
+end
+return units
+"""
+# Holders of a symbol with no scored price yet are scored at 0.
+_TICK_SCRIPT = """
+local old = tonumber(redis.call('hget', KEYS[2], ARGV[1])) or 0
+local new = tonumber(ARGV[2])
+redis.call('hset', KEYS[2], ARGV[1], ARGV[2])
+if old == new then
+    return 0
+end
+local delta = new - old
+local holders = redis.call('hgetall', KEYS[1])
+for i = 1, #holders, 2 do
+    local change = tonumber(holders[i + 1]) * delta
+    redis.call('zincrby', KEYS[3], change, holders[i])
+    local master = redis.call('hget', KEYS[4], holders[i])
+    if master then
+        redis.call('zincrby', 'leaderboard:master:' .. master, change, holders[i])
+    end
+end
+return #holders / 2
+"""
+
+
+def _board_key(master_id=None):
+    return MASTER_LEADERBOARD_KEY.format(master_id) if master_id else LEADERBOARD_KEY
+
+
+class Leaderboard:
+    def __init__(self, redis_client, catalog, scheduler):
+        self._redis = redis_client
+        self._catalog = catalog
+        self._scheduler = scheduler
+        self._trade_script = redis_client.register_script(_TRADE_SCRIPT)
+        self._tick_script = redis_client.register_script(_TICK_SCRIPT)
+        self._app = None
+        self._lock = threading.Lock()
+        self._pending = {}  # symbol -> latest tick price since the last rescore
+        self._jobs = []
+        self._rebuilding = threading.Lock()
+        self._running = False
+
+    def init_app(self, app):
+        self._app = app
+
+    def set_master(self, usernames, master_id):
+        """
+        Record new users' master. Never raises: it runs after the users are
+        committed; the provisioning job records the master again when it
+        links the users, which covers a failure here.
+        """
+        try:
+            self._redis.hset(USER_MASTER_KEY, mapping={username: master_id for username in usernames})
+        except Exception as e:
+            print("Error recording leaderboard masters:", e)
+
+    def record_trades(self, trades):
+        """
+        Apply committed trades, a list of (username, symbol, units_delta, price).
+        Never raises: the trade is already committed, and a rebuild repairs drift.
+        """
+        if not trades:
+            return
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            for username, symbol, units_delta, price in trades:
+                self._trade_script(
+                    keys=[HOLDERS_KEY.format(symbol), SCORED_PRICES_KEY, LEADERBOARD_KEY, USER_MASTER_KEY],
+                    args=[symbol, username, units_delta, price], client=pipe)
+            pipe.execute()
+        except Exception as e:
+            print("Error updating leaderboard:", e)
+
+    # --- ingest leader side -------------------------------------------------
+
+    def start(self):
+        self._running = True
+        if not self._jobs:
+            self._jobs = [
+                self._scheduler.every(RESCORE_SECONDS, self.rescore, "leaderboard-rescore"),
+                self._scheduler.every(REBUILD_SECONDS, self.rebuild_in_background, "leaderboard-rebuild"),
+            ]
+
+    def stop(self):
+        self._running = False
+        for job in self._jobs:
+            job.cancel()
+        self._jobs = []
+        with self._lock:
+            self._pending.clear()
+
+    def on_tick(self, symbol, price):
+        """
+        Called on the ingest thread for every trade tick.
+        """
+        if self._running:
+            with self._lock:
+                self._pending[symbol] = price
+
+    def rescore(self):
+        with self._lock:
+            prices, self._pending = self._pending, {}
+        if not prices:
+            return
+        pipe = self._redis.pipeline(transaction=False)
+        for symbol, price in prices.items():
+            self._tick_script(
+                keys=[HOLDERS_KEY.format(symbol), SCORED_PRICES_KEY, LEADERBOARD_KEY, USER_MASTER_KEY],
+                args=[symbol, price], client=pipe)
+        pipe.execute()
+
+    def rebuild_in_background(self):
+        # Rebuilds read the whole portfolio table; keep them off the scheduler thread.
+        if self._app is None or self._rebuilding.locked():
+            return
+
+        def run():
+            with self._rebuilding, self._app.app_context():
+                try:
+                    self.rebuild()
+                except Exception as e:
+                    print("Error rebuilding leaderboard:", e)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def rebuild(self):
+        """
+        Recompute every score from the portfolio table and live prices, and
+        swap the result in atomically. Needs an app context.
+        """
+        holdings = db.session.execute(
+            select(User.username, Portfolio.stock_id, Portfolio.units)
+            .join(User, Portfolio.user_id == User.id)
+        ).all()
+        symbols = sorted({self._catalog.symbol_for(row.stock_id) for row in holdings} - {None})
+        prices = dict(zip(symbols, self._redis.hmget("current_data", symbols))) if symbols else {}
+        # Unpriced symbols are scored at 0, like the tick script assumes.
+        prices = {symbol: float(price or 0) for symbol, price in prices.items()}
+
+        holders = {}
+        scores = {}
+        for username, stock_pk, units in holdings:
+            symbol = self._catalog.symbol_for(stock_pk)
+            if symbol is None:
+                continue
+            holders.setdefault(symbol, {})[username] = units
+            scores[username] = scores.get(username, 0.0) + units * prices[symbol]
+
+        masters = self._redis.hgetall(USER_MASTER_KEY)
+        old_holder_keys = [HOLDERS_KEY.format(entry.symbol) for entry in self._catalog.entries()]
+        old_master_keys = [MASTER_LEADERBOARD_KEY.format(m) for m in set(masters.values())]
+
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.delete(LEADERBOARD_KEY, SCORED_PRICES_KEY, *old_holder_keys, *old_master_keys)
+        if prices:
+            pipe.hset(SCORED_PRICES_KEY, mapping=prices)
+        for symbol, units_by_user in holders.items():
+            pipe.hset(HOLDERS_KEY.format(symbol), mapping=units_by_user)
+        if scores:
+            pipe.zadd(LEADERBOARD_KEY, scores)
+        by_master = {}
+        for username, score in scores.items():
+            if username in masters:
+                by_master.setdefault(masters[username], {})[username] = score
+        for master_id, master_scores in by_master.items():
+            pipe.zadd(MASTER_LEADERBOARD_KEY.format(master_id), master_scores)
+        pipe.execute()
+        print(f"Leaderboard rebuilt: {len(scores)} users, {len(holders)} symbols")
+        return len(scores)
+
+    # --- queries --------------------------------------------------------------
+
+    def top(self, limit=10, master_id=None):
+        rows = self._redis.zrevrange(_board_key(master_id), 0, limit - 1, withscores=True)
+        return [
+            {"rank": i + 1, "user_id": username, "portfolio_value": round(score, 2)}
+            for i, (username, score) in enumerate(rows)
+        ]
+
+    def rank(self, username, master_id=None):
+        pipe = self._redis.pipeline(transaction=False)
+        key = _board_key(master_id)
+        pipe.zrevrank(key, username)
+        pipe.zscore(key, username)
+        pipe.zcard(key)
+        rank, score, total = pipe.execute()
+        if rank is None:
+            return None
+        return {"user_id": username, "rank": rank + 1, "portfolio_value": round(score, 2), "of": total}
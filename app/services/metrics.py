@@ -0,0 +1,215 @@
+# backend/app/services/metrics.py
+"""
+Minimal in-process metrics, rendered in the Prometheus text format at /metrics.
+
+Hot-path cost is a dict lookup, a bisect and a few additions under a lock, so
+the instrumentation is safe to leave on. Values are per process; with several
+workers, scrape each one or aggregate by instance.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+import redis
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name + _format_labels(self.labelnames, key), value) for key, value in items]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class CallbackMetric:
+    """
+    Gauge or counter whose value is read from a function at scrape time.
+    With `labelname`, fn returns {label_value: value}.
+    """
+
+    def __init__(self, name, help, fn, type="gauge", labelname=None):
+        self.name, self.help, self.fn, self.type = name, help, fn, type
+        self.labelname = labelname
+
+    def samples(self):
+        value = self.fn()
+        if self.labelname:
+            return [(self.name + _format_labels((self.labelname,), (label,)), v)
+                    for label, v in value.items()]
+        return [] if value is None else [(self.name, value)]
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._values = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            data = self._values.get(key)
+            if data is None:
+                data = self._values[key] = [0] * (len(self.buckets) + 3)
+            data[index] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(data)) for key, data in self._values.items()]
+        out = []
+        for key, data in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, data):
+                cumulative += count
+                out.append((self.name + "_bucket" + _format_labels(self.labelnames, key, ("le", bound)), cumulative))
+            out.append((self.name + "_bucket" + _format_labels(self.labelnames, key, ("le", "+Inf")), data[-1]))
+            out.append((self.name + "_sum" + _format_labels(self.labelnames, key), data[-2]))
+            out.append((self.name + "_count" + _format_labels(self.labelnames, key), data[-1]))
+        return out
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self._histogram, self._labels = histogram, labels
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._histogram.observe(time.perf_counter() - self._started, **self._labels)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+
+    def _add(self, metric):
+        # Re-registering (e.g. create_app() called twice) returns the existing metric.
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def callback(self, name, help, fn, type="gauge", labelname=None):
+        metric = CallbackMetric(name, help, fn, type, labelname)
+        self._metrics[name] = metric
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics.values():
+            try:
+                samples = metric.samples()
+            except Exception as e:
+                print(f"Error collecting metric {metric.name}:", e)
+                continue
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(f"{name} {value}" for name, value in samples)
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+redis_latency = registry.histogram(
+    "redis_command_duration_seconds", "Redis command and pipeline latency", ["command"])
+
+
+class TimedPipeline(redis.client.Pipeline):
+    def execute(self, raise_on_error=True):
+        started = time.perf_counter()
+        try:
+            return super().execute(raise_on_error)
+        finally:
+            redis_latency.observe(time.perf_counter() - started, command="PIPELINE")
+
+
+class TimedRedis(redis.Redis):
+    """
+    redis.Redis that records the latency of every command and pipeline.
+    """
+
+    def execute_command(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            return super().execute_command(*args, **options)
+        finally:
+            redis_latency.observe(time.perf_counter() - started, command=str(args[0]).upper())
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return TimedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+def instrument_engine(engine):
+    """
+    Record SQL statement latency and expose connection pool utilisation.
+    """
+    from sqlalchemy import event
+
+    sql_latency = registry.histogram("sql_query_duration_seconds", "SQL statement latency")
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        sql_latency.observe(time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_started"):
+            conn.info["query_started"].pop()
+
+    pool = engine.pool
+    if hasattr(pool, "checkedout"):
+        registry.callback("db_pool_checked_out", "Connections currently checked out", pool.checkedout)
+        registry.callback("db_pool_size", "Configured pool size", pool.size)
+        registry.callback("db_pool_overflow", "Connections above pool size", pool.overflow)
@@ -0,0 +1,96 @@
+# backend/app/services/order_book.py
+"""
+Per-symbol trigger index for resting limit/stop orders.
+
+Every order fires on one side of its trigger price:
+  - buy limit, sell stop: when the price falls to the trigger or below
+  - sell limit, buy stop: when the price rises to the trigger or above
+Each symbol keeps one heap per side, with the trigger nearest to crossing on
+top. A tick pops only the orders it crosses, so it costs O(1) when nothing
+fires and O(k log n) for k fills, never a scan of the resting orders.
+Cancelled orders are dropped lazily when they reach the top.
+"""
+import heapq
+import itertools
+import threading
+
+BELOW = "below"
+ABOVE = "above"
+
+
+def trigger_side(transaction_type, order_type):
+    if (transaction_type == 'buy') == (order_type == 'limit'):
+        return BELOW
+    return ABOVE
+
+
+class TriggerBook:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._below = {}  # symbol -> heap of (-trigger, seq, order_id)
+        self._above = {}  # symbol -> heap of (trigger, seq, order_id)
+        self._live = {}   # order_id -> symbol
+        self._dead = 0    # cancelled entries still sitting in heaps
+        self._seq = itertools.count()  # equal triggers fire in arrival order
+
+    def __len__(self):
+        return len(self._live)
+
+    def add(self, order_id, symbol, side, trigger):
+        """
+        Add a resting order. Returns False if it is already in the book.
+        """
+        with self._lock:
+            if order_id in self._live:
+                return False
+            self._live[order_id] = symbol
+            if side == BELOW:
+                heapq.heappush(self._below.setdefault(symbol, []), (-trigger, next(self._seq), order_id))
+            else:
+                heapq.heappush(self._above.setdefault(symbol, []), (trigger, next(self._seq), order_id))
+            return True
+
+    def cancel(self, order_id):
+        with self._lock:
+            if self._live.pop(order_id, None) is None:
+                return False
+            self._dead += 1
+            if self._dead > 1000 and self._dead > 2 * len(self._live):
+                self._compact()
+            return True
+
+    def cross(self, symbol, price):
+        """
+        Remove and return the ids of orders on `symbol` that `price` triggers.
+        """
+        fired = []
+        with self._lock:
+            heap = self._below.get(symbol)
+            while heap and -heap[0][0] >= price:
+                self._take(heapq.heappop(heap)[2], fired)
+            heap = self._above.get(symbol)
+            while heap and heap[0][0] <= price:
+                self._take(heapq.heappop(heap)[2], fired)
+        return fired
+
+    def clear(self):
+        with self._lock:
+            self._below.clear()
+            self._above.clear()
+            self._live.clear()
+            self._dead = 0
+
+    def _take(self, order_id, fired):
+        if self._live.pop(order_id, None) is not None:
+            fired.append(order_id)
+        else:
+            self._dead -= 1
+
+    def _compact(self):
+        for books in (self._below, self._above):
+            for symbol, heap in list(books.items()):
+                heap[:] = [entry for entry in heap if entry[2] in self._live]
+                heapq.heapify(heap)
+                if not heap:
+                    del books[symbol]
+        self._dead = 0
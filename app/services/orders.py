@@ -0,0 +1,283 @@
+# backend/app/services/orders.py
+"""
+Resting limit/stop orders.
+
+Orders live in pending_orders. The process that holds the ingest lock keeps
+the open ones in a TriggerBook and checks every tick against it on the ingest
+thread. Triggered orders are handed to a fill worker, which executes them
+through trading.apply_order, the same path as market orders.
+
+Exactly-once fills: a fill first flips the order from 'open' to 'filled' with
+a conditional UPDATE in the same DB transaction as the trade. A cancel, a
+second trigger (e.g. after failover) or another leader all lose that race
+and do nothing.
+
+Placing/cancelling commits to the database and announces the change on
+ORDER_CHANNEL so the leader's book follows. In case a message is lost, the
+leader also applies every order changed since its last sync (by updated_at)
+every BOOK_SYNC_SECONDS; the full open book is only read when it becomes
+leader.
+"""
+import json
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, select, update
+
+from app import db, leaderboard, redis_client, stock_catalog
+from app.services.order_book import TriggerBook, trigger_side
+from app.services.trading import OrderRejected, apply_order, parse_order, units_delta
+from models import PendingOrder, Transaction, User
+
+ORDER_CHANNEL = "order_updates"
+ORDER_TYPES = ('limit', 'stop')
+BOOK_SYNC_SECONDS = 60
+# Re-read this much before the last sync, for rows committed after it read
+# (updated_at is set before commit) and clock skew between workers.
+BOOK_SYNC_OVERLAP = timedelta(seconds=30)
+
+# Queue items asking the fill worker to load all open orders into the book,
+# or only apply the orders changed since the last load/sync.
+_LOAD_BOOK = object()
+_SYNC_BOOK = object()
+
+
+def parse_pending_order(order):
+    """
+    Validate a limit/stop order dict and return
+    (symbol, transaction_type, order_type, units, trigger_price).
+    """
+    symbol, transaction_type, units = parse_order(order)
+    order_type = str(order.get('order_type', '')).lower()
+    if order_type not in ORDER_TYPES:
+        raise OrderRejected("Invalid order type. Must be 'limit' or 'stop'")
+    try:
+        trigger_price = round(float(order['trigger_price']), 2)
+    except (KeyError, TypeError, ValueError):
+        raise OrderRejected("trigger_price must be a number")
+    if trigger_price <= 0:
+        raise OrderRejected("trigger_price must be positive")
+    return symbol, transaction_type, order_type, units, trigger_price
+
+
+def serialize_order(order, symbol):
+    return {
+        "order_id": order.id,
+        "stock_id": symbol,
+        "transaction_type": order.transaction_type,
+        "order_type": order.order_type,
+        "units": order.units,
+        "trigger_price": order.trigger_price,
+        "status": order.status,
+        "fill_price": order.fill_price,
+        "error": order.error,
+        "created_at": order.created_at.isoformat() if order.created_at else None,
+        "updated_at": order.updated_at.isoformat() if order.updated_at else None,
+    }
+
+
+def place_order(user, stock, transaction_type, order_type, units, trigger_price):
+    order = PendingOrder(user_id=user.id, stock_id=stock.id, transaction_type=transaction_type,
+                         order_type=order_type, units=units, trigger_price=trigger_price,
+                         status='open')
+    db.session.add(order)
+    db.session.commit()
+    redis_client.publish(ORDER_CHANNEL, json.dumps({
+        "op": "place", "id": order.id, "symbol": stock.symbol,
+        "side": trigger_side(transaction_type, order_type), "trigger": trigger_price,
+    }))
+    return order
+
+
+def cancel_order(user, order_id):
+    """
+    Cancel an open order of `user`. Returns False if it is not open (any more).
+    """
+    cancelled = db.session.execute(
+        update(PendingOrder)
+        .where(PendingOrder.id == order_id, PendingOrder.user_id == user.id,
+               PendingOrder.status == 'open')
+        .values(status='cancelled', updated_at=datetime.utcnow())
+        .returning(PendingOrder.id)
+    ).first()
+    db.session.commit()
+    if cancelled:
+        redis_client.publish(ORDER_CHANNEL, json.dumps({"op": "cancel", "id": order_id}))
+    return cancelled is not None
+
+
+def fill_order(order_id, price):
+    """
+    Execute a triggered order at `price` and commit. Returns 'filled',
+    'rejected', or None if the order was no longer open.
+    """
+    now = datetime.utcnow()
+    order = db.session.execute(
+        update(PendingOrder)
+        .where(PendingOrder.id == order_id, PendingOrder.status == 'open')
+        .values(status='filled', fill_price=price, updated_at=now)
+        .returning(PendingOrder.user_id, PendingOrder.stock_id,
+                   PendingOrder.transaction_type, PendingOrder.units)
+    ).first()
+    if order is None:
+        db.session.rollback()
+        return None
+    try:
+        row = apply_order(order.user_id, order.stock_id, order.transaction_type, order.units, price)
+    except OrderRejected as e:
+        db.session.rollback()
+        db.session.execute(
+            update(PendingOrder)
+            .where(PendingOrder.id == order_id, PendingOrder.status == 'open')
+            .values(status='rejected', error=str(e), updated_at=now))
+        db.session.commit()
+        return 'rejected'
+    db.session.execute(insert(Transaction), [row])
+    db.session.commit()
+    username = db.session.execute(select(User.username).where(User.id == order.user_id)).scalar()
+    leaderboard.record_trades([(username, stock_catalog.symbol_for(order.stock_id),
+                                units_delta(order.transaction_type, order.units), price)])
+    return 'filled'
+
+
+class OrderTriggers:
+    """
+    Runs in every process but only does work while started, i.e. while this
+    process holds the ingest lock.
+    """
+
+    def __init__(self, catalog, scheduler):
+        self.book = TriggerBook()
+        self._catalog = catalog
+        self._scheduler = scheduler
+        self._app = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._sync_job = None
+        self._synced_at = None  # start of the last load/sync, for the next sync
+        self._running = False
+        self.fills = 0
+        self.rejects = 0
+        self.last_trigger_ms = 0.0  # tick seen -> fill committed
+        self.max_trigger_ms = 0.0
+
+    def init_app(self, app):
+        self._app = app
+
+    def start(self):
+        self._running = True
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put(_LOAD_BOOK)
+        if self._sync_job is None:
+            self._sync_job = self._scheduler.every(
+                BOOK_SYNC_SECONDS, lambda: self._queue.put(_SYNC_BOOK), "order-book-sync",
+                delay=BOOK_SYNC_SECONDS)
+
+    def stop(self):
+        self._running = False
+        if self._sync_job is not None:
+            self._sync_job.cancel()
+            self._sync_job = None
+        self.book.clear()
+        self._synced_at = None
+
+    def handle_message(self, payload):
+        """
+        ORDER_CHANNEL handler, called on the pub/sub listener thread.
+        """
+        if not self._running:
+            return
+        if payload["op"] == "place":
+            self.book.add(payload["id"], payload["symbol"], payload["side"], payload["trigger"])
+        elif payload["op"] == "cancel":
+            self.book.cancel(payload["id"])
+
+    def on_tick(self, symbol, price):
+        """
+        Called on the ingest thread for every trade tick.
+        """
+        if not self._running:
+            return
+        seen = time.perf_counter()
+        for order_id in self.book.cross(symbol, price):
+            self._queue.put((order_id, round(price, 2), seen))
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            with self._app.app_context():
+                try:
+                    if item is _LOAD_BOOK:
+                        self._load_book()
+                    elif item is _SYNC_BOOK:
+                        self._sync_book()
+                    else:
+                        self._fill(*item)
+                except Exception as e:
+                    db.session.rollback()
+                    print("Error in order fill worker:", e)
+
+    def _fill(self, order_id, price, seen):
+        result = fill_order(order_id, price)
+        if result == 'filled':
+            self.fills += 1
+        elif result == 'rejected':
+            self.rejects += 1
+        if result is not None:
+            elapsed_ms = (time.perf_counter() - seen) * 1000
+            self.last_trigger_ms = elapsed_ms
+            self.max_trigger_ms = max(self.max_trigger_ms, elapsed_ms)
+
+    def _load_book(self):
+        if not self._running:
+            return
+        started = datetime.utcnow()
+        rows = db.session.execute(
+            select(PendingOrder.id, PendingOrder.stock_id, PendingOrder.transaction_type,
+                   PendingOrder.order_type, PendingOrder.trigger_price)
+            .where(PendingOrder.status == 'open')
+        ).all()
+        added = sum(self._rest(row) for row in rows)
+        self._synced_at = started
+        print(f"Order book: loaded {added} open orders ({len(self.book)} resting)")
+
+    def _sync_book(self):
+        if not self._running:
+            return
+        if self._synced_at is None:
+            return self._load_book()
+        started = datetime.utcnow()
+        rows = db.session.execute(
+            select(PendingOrder.id, PendingOrder.stock_id, PendingOrder.transaction_type,
+                   PendingOrder.order_type, PendingOrder.trigger_price, PendingOrder.status)
+            .where(PendingOrder.updated_at >= self._synced_at - BOOK_SYNC_OVERLAP)
+        ).all()
+        added = removed = 0
+        for row in rows:
+            if row.status == 'open':
+                added += self._rest(row)
+            elif self.book.cancel(row.id):
+                removed += 1
+        self._synced_at = started
+        if added or removed:
+            print(f"Order book sync: {added} missed placements, {removed} missed cancels "
+                  f"({len(self.book)} resting)")
+
+    def _rest(self, row):
+        symbol = self._catalog.symbol_for(row.stock_id)
+        return bool(symbol) and self.book.add(
+            row.id, symbol, trigger_side(row.transaction_type, row.order_type), row.trigger_price)
+
+    def stats(self):
+        return {
+            "resting": len(self.book),
+            "fills": self.fills,
+            "rejects": self.rejects,
+            "fill_queue": self._queue.qsize(),
+            "last_trigger_ms": round(self.last_trigger_ms, 3),
+            "max_trigger_ms": round(self.max_trigger_ms, 3),
+        }
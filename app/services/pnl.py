@@ -0,0 +1,181 @@
+# backend/app/services/pnl.py
+"""
+FIFO lot P&L.
+
+Every buy opens a lot and every sell closes the oldest lots first. Realized
+P&L and the cost of what is still open are kept per (user, stock) in
+pnl_summary, updated by trading.apply_order in the same DB transaction as the
+trade, so reads never replay history.
+
+backfill_pnl() rebuilds position_lots and pnl_summary from the transactions
+table. The matching is vectorized: per holding, the k-th unit sold is matched
+to the k-th unit bought, so a sell covering sold units (a, b] costs
+C(b) - C(a), where C(x) is the cost of the first x units bought. With all
+holdings laid end to end on one axis, C is one cumulative sum over every buy
+and each sell is two searchsorted lookups, instead of a Python loop per row.
+"""
+import numpy as np
+from sqlalchemy import delete, insert, select
+
+from app import db
+from models import Portfolio, PnlSummary, PositionLot, Transaction
+
+BACKFILL_USERS_PER_CHUNK = 2000
+
+
+def fifo_pnl(user_ids, stock_ids, is_buy, units, prices):
+    """
+    Match buys and sells FIFO for many holdings at once.
+
+    Inputs are equal-length arrays sorted by (user, stock, time). Returns
+    (summary, lots):
+      summary: dict of per-holding arrays user_id, stock_id, realized,
+               open_units, open_cost
+      lots:    dict of per-lot arrays row (index of the buy in the input) and
+               units (still open), only for lots with units left
+    A sell of more units than were held at the time only closes what was held,
+    as the trade endpoint would have enforced.
+    """
+    user_ids = np.asarray(user_ids)
+    stock_ids = np.asarray(stock_ids)
+    is_buy = np.asarray(is_buy, dtype=bool)
+    units = np.asarray(units, dtype=np.int64)
+    prices = np.asarray(prices, dtype=np.float64)
+    n = len(units)
+    if n == 0:
+        empty_i, empty_f = np.zeros(0, np.int64), np.zeros(0, np.float64)
+        return ({"user_id": empty_i, "stock_id": empty_i, "realized": empty_f,
+                 "open_units": empty_i, "open_cost": empty_f},
+                {"row": empty_i, "units": empty_i})
+
+    new_group = np.ones(n, dtype=bool)
+    new_group[1:] = (user_ids[1:] != user_ids[:-1]) | (stock_ids[1:] != stock_ids[:-1])
+    starts = np.flatnonzero(new_group)
+    group = np.cumsum(new_group) - 1
+
+    # Position after each row, floored at zero: position = running total minus
+    # the lowest the running total has been (a running minimum per holding;
+    # offsetting each holding by -group * span keeps one holding's minimum
+    # from leaking into the next).
+    delta = np.where(is_buy, units, -units)
+    cum = np.cumsum(delta)
+    local = cum - (cum - delta)[starts][group]
+    span = 2 * int(units.sum()) + 1
+    floor = np.minimum(np.minimum.accumulate(local - group * span) + group * span, 0)
+    prev_floor = np.zeros(n, dtype=np.int64)
+    prev_floor[1:] = floor[:-1]
+    prev_floor[starts] = 0
+
+    buy_units = np.where(is_buy, units, 0)
+    # Units each sell actually closed.
+    sell_units = np.where(is_buy, 0, units + floor - prev_floor)
+    buy_cum = np.cumsum(buy_units)
+    sell_cum = np.cumsum(sell_units)
+    # Units bought/sold by earlier holdings, i.e. where each holding starts on the axis.
+    buy_base = (buy_cum - buy_units)[starts]
+    sell_base = (sell_cum - sell_units)[starts]
+    group_bought = np.append(buy_base[1:], buy_cum[-1]) - buy_base
+    group_sold = np.append(sell_base[1:], sell_cum[-1]) - sell_base
+
+    lot_rows = np.flatnonzero(is_buy & (units > 0))
+    lot_end = buy_cum[lot_rows]
+    lot_price = prices[lot_rows]
+    lot_cost_cum = np.cumsum(units[lot_rows] * lot_price)
+
+    def cost_to(x):
+        # FIFO cost of the first x units on the global axis.
+        if len(lot_rows) == 0:
+            return np.zeros(len(x))
+        i = np.minimum(np.searchsorted(lot_end, x, side='left'), len(lot_rows) - 1)
+        prev_end = np.where(i > 0, lot_end[i - 1], 0)
+        prev_cost = np.where(i > 0, lot_cost_cum[i - 1], 0.0)
+        return prev_cost + (x - prev_end) * lot_price[i]
+
+    sells = np.flatnonzero(~is_buy)
+    sell_group = group[sells]
+    # This sell closed units (start, end] of its holding's buys, in FIFO order.
+    end = buy_base[sell_group] + sell_cum[sells] - sell_base[sell_group]
+    start = end - sell_units[sells]
+    realized_rows = sell_units[sells] * prices[sells] - (cost_to(end) - cost_to(start))
+    realized = np.bincount(sell_group, weights=realized_rows, minlength=len(starts))
+
+    open_units = group_bought - group_sold
+    open_cost = cost_to(buy_base + group_bought) - cost_to(buy_base + group_sold)
+
+    consumed = (buy_base + group_sold)[group[lot_rows]]
+    lot_left = np.clip(lot_end - consumed, 0, units[lot_rows])
+    keep = lot_left > 0
+
+    summary = {
+        "user_id": user_ids[starts],
+        "stock_id": stock_ids[starts],
+        "realized": realized,
+        "open_units": open_units,
+        "open_cost": open_cost,
+    }
+    return summary, {"row": lot_rows[keep], "units": lot_left[keep]}
+
+
+def _backfill_users(user_pks):
+    # Lock the users' holdings so trades for them wait until this chunk commits.
+    db.session.execute(select(Portfolio.id).where(Portfolio.user_id.in_(user_pks)).with_for_update())
+    rows = db.session.execute(
+        select(Transaction.user_id, Transaction.stock_id, Transaction.transaction_type,
+               Transaction.units, Transaction.price, Transaction.created_at)
+        .where(Transaction.user_id.in_(user_pks))
+        .order_by(Transaction.user_id, Transaction.stock_id, Transaction.created_at, Transaction.id)
+    ).all()
+    user_ids, stock_ids, types, units, prices, created = zip(*rows) if rows else ((),) * 6
+    summary, lots = fifo_pnl(
+        np.array(user_ids, dtype=np.int64), np.array(stock_ids, dtype=np.int64),
+        np.array([t == 'buy' for t in types], dtype=bool),
+        np.array(units, dtype=np.int64), np.array(prices, dtype=np.float64))
+
+    db.session.execute(delete(PositionLot).where(PositionLot.user_id.in_(user_pks)))
+    db.session.execute(delete(PnlSummary).where(PnlSummary.user_id.in_(user_pks)))
+    if len(lots["row"]):
+        db.session.execute(insert(PositionLot), [
+            {"user_id": user_ids[row], "stock_id": stock_ids[row], "units": int(left),
+             "price": prices[row], "opened_at": created[row]}
+            for row, left in zip(lots["row"].tolist(), lots["units"].tolist())
+        ])
+    if len(summary["user_id"]):
+        db.session.execute(insert(PnlSummary), [
+            {"user_id": u, "stock_id": s, "realized": r, "open_units": ou, "open_cost": oc}
+            for u, s, r, ou, oc in zip(*(summary[k].tolist() for k in
+                                         ("user_id", "stock_id", "realized", "open_units", "open_cost")))
+        ])
+    db.session.commit()
+    return len(rows), len(summary["user_id"])
+
+
+def backfill_pnl(chunk_size=BACKFILL_USERS_PER_CHUNK):
+    """
+    Rebuild position_lots and pnl_summary from transactions, a chunk of users
+    per DB transaction. Returns (transactions, holdings) processed.
+    """
+    transactions = holdings = 0
+    last_user = 0
+    while True:
+        user_pks = db.session.execute(
+            select(Transaction.user_id).where(Transaction.user_id > last_user)
+            .group_by(Transaction.user_id).order_by(Transaction.user_id).limit(chunk_size)
+        ).scalars().all()
+        if not user_pks:
+            break
+        t, h = _backfill_users(user_pks)
+        transactions += t
+        holdings += h
+        last_user = user_pks[-1]
+        print(f"P&L backfill: {transactions} transactions, {holdings} holdings (users up to {last_user})")
+    return transactions, holdings
+
+
+def get_user_pnl(user_pk):
+    """
+    Precomputed P&L rows for a user, one per stock ever traded.
+    """
+    return db.session.execute(
+        select(PnlSummary.stock_id, PnlSummary.realized, PnlSummary.open_units, PnlSummary.open_cost)
+        .where(PnlSummary.user_id == user_pk)
+    ).all()
@@ -0,0 +1,100 @@
+# backend/app/services/price_cache.py
+"""
+Process-local L1 cache over the current_data hash in Redis.
+
+Entries are kept fresh by the price fan-out listener, which sees every
+published change. They are trusted only while that listener is connected
+and for at most `max_age` seconds, so staleness stays bounded even if a
+notification is lost. Misses (and fresh=True reads) go to Redis.
+"""
+import threading
+import time
+
+
+class PriceCache:
+    def __init__(self, redis_client, fanout, max_age=30.0):
+        self._redis = redis_client
+        self._fanout = fanout
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = {}  # symbol -> (price, seq, stored_at)
+        self._epoch = None  # listener connection the entries were collected on
+        self.hits = 0
+        self.misses = 0
+        fanout.add_price_listener(self._on_prices)
+
+    def _on_prices(self, prices, seq):
+        now = time.monotonic()
+        with self._lock:
+            for symbol, price in prices.items():
+                self._store(symbol, price, seq, now)
+
+    def _store(self, symbol, price, seq, now):
+        # Never let an older read overwrite a newer pushed price.
+        current = self._entries.get(symbol)
+        if current is None or seq >= current[1]:
+            self._entries[symbol] = (price, seq, now)
+
+    def _usable(self):
+        if not self._fanout.connected:
+            return False
+        if self._epoch != self._fanout.connection_epoch:
+            # Changes may have been missed while the listener was reconnecting.
+            with self._lock:
+                self._entries.clear()
+                self._epoch = self._fanout.connection_epoch
+        return True
+
+    def get_many(self, symbols, fresh=False):
+        """
+        Prices for `symbols` (None where Redis has no price), reading only the
+        misses from Redis, in one round-trip. fresh=True always reads Redis.
+        """
+        now = time.monotonic()
+        result = {}
+        missing = []
+        if not fresh and self._usable():
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                if entry is not None and now - entry[2] <= self.max_age:
+                    result[symbol] = entry[0]
+                else:
+                    missing.append(symbol)
+        else:
+            missing = list(symbols)
+        self.hits += len(result)
+        self.misses += len(missing)
+
+        if missing:
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.hmget("current_data", missing)
+            pipe.hmget("current_seq", missing)
+            prices, seqs = pipe.execute()
+            cacheable = self._fanout.connected and self._epoch == self._fanout.connection_epoch
+            with self._lock:
+                for symbol, price, seq in zip(missing, prices, seqs):
+                    result[symbol] = price
+                    if price is not None and cacheable:
+                        self._store(symbol, price, int(seq or 0), now)
+        return [result[symbol] for symbol in symbols]
+
+    def get(self, symbol, fresh=False):
+        return self.get_many([symbol], fresh=fresh)[0]
+
+    def prune(self):
+        """
+        Drop entries older than max_age; they would be re-read from Redis anyway.
+        """
+        cutoff = time.monotonic() - self.max_age
+        with self._lock:
+            for symbol in [s for s, entry in self._entries.items() if entry[2] < cutoff]:
+                del self._entries[symbol]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else None,
+            "entries": len(self._entries),
+        }
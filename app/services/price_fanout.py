@@ -0,0 +1,281 @@
+# backend/app/services/price_fanout.py
+"""
+Process-local fan-out of price and market-status updates.
+
+The ingest path publishes every price change once on a Redis channel. Each
+worker process runs a single listener thread which pushes those updates to the
+streams subscribed in that process, so an idle stream never touches Redis.
+An inverted index (symbol -> subscriptions) means a tick only touches the
+streams watching that symbol.
+"""
+import json
+import os
+import threading
+import time
+
+PRICE_CHANNEL = "price_updates"
+MARKET_STATUS_CHANNEL = "market_status_updates"
+SUBSCRIPTION_CHANNEL = "subscription_updates"
+
+
+def next_price_seq(last=0):
+    """
+    Sequence number for a published price batch, also used as the SSE event id.
+    Millisecond timestamps, bumped to stay strictly increasing, so ids keep
+    growing across ingest restarts.
+    """
+    return max(last + 1, int(time.time() * 1000))
+
+
+class Subscription:
+    """
+    Mailbox for one open stream. Updates are coalesced per symbol, so a slow
+    reader only ever sees the latest price and memory stays bounded.
+    """
+
+    def __init__(self, symbols=None, client_ids=()):
+        # symbols=None means "every symbol", used by streams that filter themselves.
+        self.symbols = set(symbols) if symbols is not None else None
+        # Registry ids whose subscription changes are routed to this stream.
+        self.client_ids = tuple(client_ids)
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._prices = {}
+        self._seq = 0
+        self._market_status = None
+        self._added_symbols = None
+
+    def push_prices(self, prices, seq=0):
+        with self._lock:
+            self._seq = max(self._seq, seq)
+            if self.symbols is None:
+                self._prices.update(prices)
+            else:
+                for symbol, price in prices.items():
+                    if symbol in self.symbols:
+                        self._prices[symbol] = price
+            if not self._prices:
+                return
+        self._event.set()
+
+    def push_market_status(self, status):
+        with self._lock:
+            self._market_status = status
+        self._event.set()
+
+    def push_added_symbols(self, symbols):
+        """
+        Tell the reader which symbols were added, so it can send their snapshot.
+        """
+        with self._lock:
+            if self._added_symbols is None:
+                self._added_symbols = set()
+            self._added_symbols.update(symbols)
+        self._event.set()
+
+    # add_symbols/remove_symbols only change the mailbox filter; go through
+    # PriceFanout.add_symbols/remove_symbols so the symbol index follows.
+    def add_symbols(self, symbols):
+        with self._lock:
+            self.symbols.update(symbols)
+
+    def remove_symbols(self, symbols):
+        with self._lock:
+            self.symbols.difference_update(symbols)
+            for symbol in symbols:
+                self._prices.pop(symbol, None)
+            if self._added_symbols:
+                self._added_symbols.difference_update(symbols)
+
+    def wake(self):
+        """
+        Return a blocked wait() early, e.g. when the stream is closing.
+        """
+        self._event.set()
+
+    def wait(self, timeout=None):
+        """
+        Block until something arrives (or timeout) and return a tuple of
+        (prices, market_status, added_symbols, seq). Empty values mean nothing
+        changed; seq is the highest sequence number covered by `prices`.
+        """
+        self._event.wait(timeout)
+        with self._lock:
+            self._event.clear()
+            prices, self._prices = self._prices, {}
+            status, self._market_status = self._market_status, None
+            added, self._added_symbols = self._added_symbols, None
+            seq = self._seq
+        return prices, status, added, seq
+
+
+class PriceFanout:
+    """
+    One Redis pub/sub listener per process shared by all local subscriptions.
+    The listener is started lazily so it always runs in the process that owns
+    the streams (e.g. after a gunicorn fork).
+    """
+
+    def __init__(self, redis_client, get_market_status):
+        self._redis = redis_client
+        self._get_market_status = get_market_status
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._by_symbol = {}   # symbol -> subscriptions watching it
+        self._wildcard = set()  # subscriptions that want every symbol
+        self._by_client = {}   # registry client id -> subscriptions
+        self._handlers = {}
+        self._price_listeners = []
+        self._thread = None
+        self._pid = None
+        self.market_status = "CLOSED"
+        # True while the listener is subscribed, i.e. no price change can be missed.
+        self.connected = False
+        # Bumped on every (re)connect; caches drop entries from older connections.
+        self.connection_epoch = 0
+
+    def add_handler(self, channel, handler):
+        """
+        Also listen on `channel` and call handler(payload) for each message.
+        Must be registered before start().
+        """
+        self._handlers[channel] = handler
+
+    def add_price_listener(self, listener):
+        """
+        Call listener(prices, seq) for every published price batch.
+        """
+        self._price_listeners.append(listener)
+
+    def start(self):
+        with self._lock:
+            # A thread started before a fork does not exist in the child.
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            self.market_status = self._get_market_status()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._listen, daemon=True)
+            self._thread.start()
+
+    def subscribe(self, symbols=None, client_ids=()):
+        self.start()
+        subscription = Subscription(symbols, client_ids)
+        with self._lock:
+            self._subscriptions.add(subscription)
+            if subscription.symbols is None:
+                self._wildcard.add(subscription)
+            else:
+                self._index(subscription, subscription.symbols)
+            for client_id in subscription.client_ids:
+                self._by_client.setdefault(client_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+            self._wildcard.discard(subscription)
+            if subscription.symbols is not None:
+                self._unindex(subscription, list(subscription.symbols))
+            for client_id in subscription.client_ids:
+                subscriptions = self._by_client.get(client_id)
+                if subscriptions is not None:
+                    subscriptions.discard(subscription)
+                    if not subscriptions:
+                        del self._by_client[client_id]
+
+    def add_symbols(self, subscription, symbols):
+        with self._lock:
+            subscription.add_symbols(symbols)
+            if subscription in self._subscriptions:
+                self._index(subscription, symbols)
+
+    def remove_symbols(self, subscription, symbols):
+        with self._lock:
+            subscription.remove_symbols(symbols)
+            self._unindex(subscription, symbols)
+
+    def _index(self, subscription, symbols):
+        for symbol in symbols:
+            self._by_symbol.setdefault(symbol, set()).add(subscription)
+
+    def _unindex(self, subscription, symbols):
+        for symbol in symbols:
+            subscriptions = self._by_symbol.get(symbol)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._by_symbol[symbol]
+
+    def _listen(self):
+        while True:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(PRICE_CHANNEL, MARKET_STATUS_CHANNEL, SUBSCRIPTION_CHANNEL,
+                                 *self._handlers)
+                self.connection_epoch += 1
+                self.connected = True
+                # Status may have changed while we were disconnected.
+                self._dispatch_market_status(self._get_market_status())
+                for message in pubsub.listen():
+                    self._dispatch(message["channel"], json.loads(message["data"]))
+            except Exception as e:
+                print("Error in price fan-out listener:", e)
+            finally:
+                # Release the old connection before the retry opens a new one.
+                try:
+                    pubsub.close()
+                except Exception as e:
+                    print("Error closing price fan-out pubsub:", e)
+            self.connected = False
+            time.sleep(1)
+
+    def _dispatch(self, channel, payload):
+        if channel == PRICE_CHANNEL:
+            prices, seq = payload["prices"], payload.get("seq", 0)
+            for listener in self._price_listeners:
+                listener(prices, seq)
+            for subscription, batch in self._route(prices):
+                subscription.push_prices(batch, seq)
+        elif channel == MARKET_STATUS_CHANNEL:
+            self._dispatch_market_status(payload)
+        elif channel == SUBSCRIPTION_CHANNEL:
+            self._dispatch_subscription_change(payload)
+        elif channel in self._handlers:
+            self._handlers[channel](payload)
+
+    def _route(self, prices):
+        """
+        Split a price batch into per-subscription batches using the symbol index.
+        """
+        with self._lock:
+            batches = {}
+            for symbol, price in prices.items():
+                for subscription in self._by_symbol.get(symbol, ()):
+                    batches.setdefault(subscription, {})[symbol] = price
+            for subscription in self._wildcard:
+                batches[subscription] = prices
+        return batches.items()
+
+    def _dispatch_subscription_change(self, payload):
+        added, removed = payload.get("add", []), payload.get("remove", [])
+        with self._lock:
+            subscriptions = list(self._by_client.get(payload["client_id"], ()))
+        for subscription in subscriptions:
+            if subscription.symbols is None:
+                continue
+            if removed:
+                self.remove_symbols(subscription, removed)
+            if added:
+                self.add_symbols(subscription, added)
+                subscription.push_added_symbols(added)
+
+    def _dispatch_market_status(self, status):
+        if status == self.market_status:
+            return
+        self.market_status = status
+        for subscription in self._snapshot():
+            subscription.push_market_status(status)
+
+    def _snapshot(self):
+        with self._lock:
+            return list(self._subscriptions)
@@ -0,0 +1,112 @@
+# backend/app/services/scheduler.py
+"""
+One in-process scheduler thread for periodic jobs (market-status polling,
+cache refresh, rollups) instead of a chain of threading.Timer threads.
+
+Jobs run one at a time on the scheduler thread, so they must be short;
+hand long work to another thread. Each job records how late it started
+(lag) and how long it ran, so a slow job shows up in /metrics.
+"""
+import heapq
+import itertools
+import threading
+import time
+
+
+class Job:
+    def __init__(self, scheduler, name, interval, fn):
+        self._scheduler = scheduler
+        self.name = name
+        self.interval = interval
+        self.fn = fn
+        self.cancelled = False
+        self.runs = 0
+        self.errors = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_duration = 0.0
+
+    def cancel(self):
+        self.cancelled = True
+        self._scheduler._forget(self)
+
+
+class Scheduler:
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []  # (due, tiebreak, job)
+        self._counter = itertools.count()
+        self._jobs = {}
+        self._thread = None
+
+    def every(self, interval, fn, name, delay=None):
+        """
+        Run fn() every `interval` seconds, first after `delay` (default: now).
+        Returns a Job that can be cancelled.
+        """
+        job = Job(self, name, interval, fn)
+        due = time.monotonic() + (0 if delay is None else delay)
+        with self._cond:
+            self._jobs[id(job)] = job
+            heapq.heappush(self._heap, (due, next(self._counter), job))
+            self._cond.notify()
+        self.start()
+        return job
+
+    def _forget(self, job):
+        with self._cond:
+            self._jobs.pop(id(job), None)
+
+    def start(self):
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while True:
+                    # Drop cancelled jobs lazily as they reach the top.
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._cond.wait()
+                        continue
+                    due = self._heap[0][0]
+                    now = time.monotonic()
+                    if due <= now:
+                        break
+                    self._cond.wait(due - now)
+                due, _, job = heapq.heappop(self._heap)
+
+            started = time.monotonic()
+            job.last_lag = started - due
+            job.max_lag = max(job.max_lag, job.last_lag)
+            try:
+                job.fn()
+            except Exception as e:
+                job.errors += 1
+                print(f"Error in scheduled job {job.name}:", e)
+            job.runs += 1
+            job.last_duration = time.monotonic() - started
+
+            if not job.cancelled:
+                # Keep the cadence, but never queue up a burst of missed runs.
+                next_due = max(due + job.interval, time.monotonic())
+                with self._cond:
+                    heapq.heappush(self._heap, (next_due, next(self._counter), job))
+
+    def stats(self):
+        with self._cond:
+            jobs = list(self._jobs.values())
+        return {
+            job.name: {
+                "interval": job.interval,
+                "runs": job.runs,
+                "errors": job.errors,
+                "last_lag": round(job.last_lag, 4),
+                "max_lag": round(job.max_lag, 4),
+                "last_duration": round(job.last_duration, 4),
+            } for job in jobs
+        }
@@ -0,0 +1,190 @@
+# backend/app/services/search.py
+"""
+In-memory typeahead search over the stock catalog.
+
+Two indexes, rebuilt whenever the catalog reloads:
+  - prefix: sorted (key, entry) lists for symbols and for every word of the
+    name; a prefix is a bisect plus a walk over the matches
+  - trigram: trigram -> entries whose symbol/name contain it, for typos and
+    infix matches ("relance" ~ "RELIANCE", "motors" ~ "TATAMOTORS")
+
+Ranking, best first: exact symbol, symbol prefix, name-word prefix (first
+word before later words), then trigram similarity. Shorter symbols win ties,
+so "TCS" comes before "TCSINFRA" for "tcs". One- and two-character prefixes
+match thousands of keys, so their best MAX_RESULTS are precomputed.
+"""
+import bisect
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+MAX_RESULTS = 50
+SHORT_PREFIX = 2
+# Longer prefixes are walked in key order, up to this many keys.
+MAX_PREFIX_CANDIDATES = 200
+# Fuzzy candidates come from the rarest query trigrams only; anything that
+# shares MIN_SIMILARITY of them must appear in one of those lists. Very common
+# trigrams ("ind", "ltd") are cut to their first MAX_TRIGRAM_POSTINGS entries.
+MAX_TRIGRAM_POSTINGS = 1000
+MAX_TRIGRAM_CANDIDATES = 100
+MIN_SIMILARITY = 0.5
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize(text):
+    return _NON_ALNUM.sub(" ", (text or "").lower()).strip()
+
+
+def trigrams(text):
+    padded = f" {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    def __init__(self, entries=()):
+        self.entries = list(entries)
+        self._names = [normalize(entry.name) for entry in self.entries]
+        self._texts = []
+        symbols = []
+        words = []
+        postings = defaultdict(list)
+        for i, entry in enumerate(self.entries):
+            symbol = normalize(entry.symbol).replace(" ", "")
+            symbols.append((symbol, i))
+            for position, word in enumerate(self._names[i].split()):
+                words.append((word, i, position))
+            text = f"{symbol} {self._names[i]}"
+            # Padded like trigrams() pads, so `gram in text` is a trigram test.
+            self._texts.append(f" {text} ")
+            for gram in trigrams(text):
+                postings[gram].append(i)
+        symbols.sort()
+        words.sort()
+        self._symbol_keys = [key for key, _ in symbols]
+        self._symbol_ids = [i for _, i in symbols]
+        self._symbol_keys_by_id = [None] * len(self.entries)
+        for key, i in symbols:
+            self._symbol_keys_by_id[i] = key
+        self._word_keys = [key for key, _, _ in words]
+        self._word_refs = [(i, position) for _, i, position in words]
+        self._postings = dict(postings)
+
+        # Best entries for every short prefix, in the order search() ranks them:
+        # walk the entries best-first and keep the first MAX_RESULTS per prefix.
+        ranked = sorted(range(len(self.entries)), key=self._tiebreak)
+        self._short_symbols = defaultdict(list)
+        self._short_words = defaultdict(list)
+        name_words = [name.split() for name in self._names]
+        for first_words in (True, False):
+            for i in ranked:
+                if first_words:
+                    self._add_short(self._short_symbols, self._symbol_keys_by_id[i], i)
+                for position, word in enumerate(name_words[i]):
+                    if (position == 0) == first_words:
+                        self._add_short(self._short_words, word, (i, position))
+
+    @staticmethod
+    def _add_short(lists, key, item):
+        for n in range(1, min(SHORT_PREFIX, len(key)) + 1):
+            matches = lists[key[:n]]
+            if len(matches) < MAX_RESULTS:
+                matches.append(item)
+
+    def _tiebreak(self, i):
+        symbol = self.entries[i].symbol
+        return len(symbol), symbol
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _prefix(self, keys, query):
+        start = bisect.bisect_left(keys, query)
+        end = start
+        limit = min(len(keys), start + MAX_PREFIX_CANDIDATES)
+        while end < limit and keys[end].startswith(query):
+            end += 1
+        return start, end
+
+    def search(self, query, limit=10):
+        """
+        Return up to `limit` (entry, score) pairs, best first.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        compact = query.replace(" ", "")
+        scores = {}
+
+        def offer(i, score):
+            if score > scores.get(i, 0):
+                scores[i] = score
+
+        if len(compact) <= SHORT_PREFIX:
+            symbol_matches = self._short_symbols.get(compact, ())
+        else:
+            start, end = self._prefix(self._symbol_keys, compact)
+            symbol_matches = self._symbol_ids[start:end]
+        for i in symbol_matches:
+            # Exact match 100; prefixes 90 down to 80 as the symbol gets longer.
+            extra = len(self._symbol_keys_by_id[i]) - len(compact)
+            offer(i, 100 if extra == 0 else 90 - min(extra, 10))
+
+        first_word = query.split()[0]
+        if len(first_word) <= SHORT_PREFIX:
+            word_matches = self._short_words.get(first_word, ())
+        else:
+            start, end = self._prefix(self._word_keys, first_word)
+            word_matches = self._word_refs[start:end]
+        for i, position in word_matches:
+            name = self._names[i]
+            if position == 0 and name.startswith(query):
+                offer(i, 75)
+            elif query in name:
+                offer(i, 70 if position == 0 else 65)
+
+        if len(scores) < limit and len(compact) >= 3:
+            grams = trigrams(compact)
+            needed = math.ceil(MIN_SIMILARITY * len(grams))
+            lists = sorted((self._postings[g] for g in grams if g in self._postings), key=len)
+            hits = Counter()
+            for postings in lists[:max(len(lists) - needed + 1, 0)]:
+                hits.update(postings[:MAX_TRIGRAM_POSTINGS])
+            word_grams = [trigrams(word) for word in query.split()]
+            total = sum(len(g) for g in word_grams)
+            for i, _ in hits.most_common(MAX_TRIGRAM_CANDIDATES):
+                text = self._texts[i]
+                if i in scores or sum(gram in text for gram in grams) < needed:
+                    continue
+                # Score each query word against its best-matching word, so
+                # "relance" matches "Reliance" rather than "Relkysig Finance".
+                words = [f" {word} " for word in text.split()]
+                shared = sum(max(sum(gram in word for gram in g) for word in words) for g in word_grams)
+                if shared >= MIN_SIMILARITY * total:
+                    offer(i, 60 * shared / total)
+
+        ranked = heapq.nsmallest(limit, scores.items(),
+                                 key=lambda item: (-item[1],) + self._tiebreak(item[0]))
+        return [(self.entries[i], round(score, 1)) for i, score in ranked]
+
+
+class StockSearch:
+    """
+    Holds the current SearchIndex; register rebuild() as a catalog listener.
+    Searches keep using the old index until the new one is swapped in.
+    """
+
+    def __init__(self):
+        self._index = SearchIndex()
+
+    def rebuild(self, entries):
+        # Built inline: reloads already run on the scheduler thread, one at a
+        # time, so a newer index can never be replaced by an older one.
+        self._index = SearchIndex(entries)
+
+    def search(self, query, limit=10):
+        return self._index.search(query, limit)
+
+    def __len__(self):
+        return len(self._index)
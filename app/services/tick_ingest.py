@@ -0,0 +1,202 @@
+# backend/app/services/tick_ingest.py
+"""
+Batched, coalescing ingestion of TrueData messages.
+
+The websocket thread only enqueues raw messages. A separate thread parses them,
+keeps the latest price per symbol, and every flush window writes all changed
+prices to Redis with one pipelined HSET and one publish.
+"""
+import json
+import queue
+import threading
+import time
+
+from app.services.price_fanout import PRICE_CHANNEL, next_price_seq
+from app.services.candles import CandleAggregator, parse_tick_time
+
+
+# Queue sentinel asking the ingest thread to roll up candles.
+_ROLL_CANDLES = object()
+
+# Hash of the running ingestor's latest stats(), wherever it runs (a web
+# worker holding the ingest lock or ingest.py). Expires if reports stop.
+INGEST_STATS_KEY = "ingest:stats"
+
+
+class TickIngestor:
+    def __init__(self, redis_client, symbol_map, update_market_status,
+                 flush_interval=0.05, stats_interval=30, max_queue=100000):
+        self._redis = redis_client
+        self._symbol_map = symbol_map
+        self._update_market_status = update_market_status
+        self.flush_interval = flush_interval
+        self.stats_interval = stats_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._pending = {}
+        self._candles = CandleAggregator()
+        self._last_seq = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._tick_listeners = []
+
+        # Counters, read by stats(). Only the ingest thread writes them
+        # (except received/dropped, which the socket thread owns).
+        self.received = 0
+        self.dropped = 0
+        self.processed = 0
+        self.flushes = 0
+        self.flushed_prices = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._window_processed = 0
+        self._window_started = time.time()
+        self.ingest_rate = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+
+    def submit(self, message):
+        """
+        Called from the websocket thread. Never blocks on Redis.
+        """
+        self.received += 1
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.dropped += 1
+
+    def add_tick_listener(self, listener):
+        """
+        Call listener(symbol, price) on the ingest thread for every trade tick.
+        Listeners must be quick; they run before the tick is flushed.
+        """
+        self._tick_listeners.append(listener)
+
+    def roll_candles(self):
+        """
+        Ask the ingest thread (which owns the candle state) to close finished bars.
+        Safe to call from any thread, e.g. the scheduler.
+        """
+        if self._thread is None:
+            return  # Not ingesting in this process.
+        try:
+            self._queue.put_nowait(_ROLL_CANDLES)
+        except queue.Full:
+            pass  # The queue is busy with ticks, which roll bars anyway.
+
+    def _run(self):
+        next_flush = time.time() + self.flush_interval
+        next_stats = time.time() + self.stats_interval
+        while True:
+            try:
+                timeout = max(next_flush - time.time(), 0)
+                try:
+                    self._parse(self._queue.get(timeout=timeout))
+                    # Drain whatever else is already waiting before flushing.
+                    while time.time() < next_flush:
+                        self._parse(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+
+                now = time.time()
+                if now >= next_flush:
+                    self._flush()
+                    next_flush = now + self.flush_interval
+                if now >= next_stats:
+                    self._report()
+                    next_stats = now + self.stats_interval
+            except Exception as e:
+                print("Error in tick ingest loop:", e)
+
+    def _parse(self, message):
+        if message is _ROLL_CANDLES:
+            self._candles.roll(time.time())
+            return
+        self.processed += 1
+        self._window_processed += 1
+        try:
+            data = json.loads(message)
+            # If the message contains market status (e.g. NSE_EQ), update market_status
+            if "NSE_EQ" in data:
+                self._update_market_status(data["NSE_EQ"])
+            # Case where the data arrives for the first time
+            elif "symbolsadded" in data:
+                for sym in data["symbollist"]:
+                    self._pending[sym[0]] = sym[3]
+            elif "trade" in data:
+                _data = data['trade']
+                # _data[0] is the TrueData symbol id and _data[2] is the price.
+                symbol = self._symbol_map.get(_data[0])
+                price = _data[2]
+                if symbol and price:
+                    self._pending[symbol] = price
+                    # Every tick (not just the coalesced last one) feeds history and candles.
+                    volume = float(_data[3]) if len(_data) > 3 and _data[3] else 0
+                    ts = parse_tick_time(_data[1] if len(_data) > 1 else None, time.time())
+                    self._candles.add_tick(symbol, ts, float(price), volume)
+                    for listener in self._tick_listeners:
+                        listener(symbol, float(price))
+        except Exception as e:
+            print("Error parsing message:", e)
+
+    def _flush(self):
+        if not self._pending and not self._candles.has_pending():
+            return
+        prices, self._pending = self._pending, {}
+        started = time.perf_counter()
+        try:
+            pipe = self._redis.pipeline(transaction=False)
+            if prices:
+                seq = self._last_seq = next_price_seq(self._last_seq)
+                pipe.hset("current_data", mapping=prices)
+                # Per-symbol sequence of the last change, used for SSE resume.
+                pipe.hset("current_seq", mapping={symbol: seq for symbol in prices})
+                pipe.publish(PRICE_CHANNEL, json.dumps({"seq": seq, "prices": prices}))
+            self._candles.flush(pipe)
+            pipe.execute()
+        except Exception as e:
+            print("Error flushing ticks to Redis:", e)
+            # Keep the prices unless newer ones arrived meanwhile; ticks and
+            # candles stay pending in the aggregator until a flush succeeds.
+            prices.update(self._pending)
+            self._pending = prices
+            return
+        self._candles.commit()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        self.flushes += 1
+        self.flushed_prices += len(prices)
+        self.last_flush_ms = elapsed_ms
+        self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+
+    def stats(self):
+        return {
+            "received": self.received,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "queue_depth": self._queue.qsize(),
+            "ingest_rate": round(self.ingest_rate, 1),
+            "flushes": self.flushes,
+            "flushed_prices": self.flushed_prices,
+            "last_flush_ms": round(self.last_flush_ms, 3),
+            "max_flush_ms": round(self.max_flush_ms, 3),
+        }
+
+    def _report(self):
+        now = time.time()
+        self.ingest_rate = self._window_processed / max(now - self._window_started, 1e-9)
+        self._window_processed = 0
+        self._window_started = now
+        stats = self.stats()
+        self.max_flush_ms = 0.0
+        print("Tick ingest stats:", stats)
+        try:
+            # Published so other processes (/metrics, tooling) can read them.
+            pipe = self._redis.pipeline(transaction=False)
+            pipe.hset(INGEST_STATS_KEY, mapping={**stats, "reported_at": now})
+            pipe.expire(INGEST_STATS_KEY, int(3 * self.stats_interval) + 1)
+            pipe.execute()
+        except Exception as e:
+            print("Error writing ingest stats:", e)
@@ -0,0 +1,249 @@
+# backend/app/services/trading.py
+"""
+Order execution shared by the single and batch trade endpoints.
+
+Position updates are single atomic statements instead of read-modify-write in
+Python, so concurrent orders for the same holding (from any number of gunicorn
+workers) never lose updates:
+  - buy:  INSERT ... ON CONFLICT (user_id, stock_id) DO UPDATE, which merges
+          units and the weighted average price in the database
+  - sell: UPDATE ... SET units = units - n WHERE units >= n, which checks and
+          decrements in one step
+Each statement takes the holding's row lock, and the caller commits right after,
+so locks are held only for the remaining inserts of the same transaction.
+
+The same transaction opens/closes FIFO lots and updates pnl_summary (see
+app/services/pnl.py); the holding's row lock serializes those too.
+"""
+from datetime import datetime
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db, get_current_prices, leaderboard, stock_catalog
+from models import Portfolio, PnlSummary, PositionLot, Transaction
+
+portfolio_table = Portfolio.__table__
+lot_table = PositionLot.__table__
+pnl_table = PnlSummary.__table__
+
+MAX_BATCH_ORDERS = 100
+
+
+class OrderRejected(Exception):
+    """
+    An order that cannot be executed. The message is safe to show to clients.
+    """
+
+
+def parse_order(order):
+    """
+    Validate one order dict and return (symbol, transaction_type, units).
+    """
+    if not isinstance(order, dict):
+        raise OrderRejected("Order must be an object")
+    missing = [field for field in ('stock_id', 'transaction_type', 'units') if field not in order]
+    if missing:
+        raise OrderRejected(f"Missing required fields: {', '.join(missing)}")
+    transaction_type = str(order['transaction_type']).lower()
+    if transaction_type not in ['buy', 'sell']:
+        raise OrderRejected("Invalid transaction type. Must be 'buy' or 'sell'")
+    units = order['units']
+    if not isinstance(units, int) or isinstance(units, bool) or units <= 0:
+        raise OrderRejected("units must be a positive integer")
+    return order['stock_id'], transaction_type, units
+
+
+def _upsert_dialect():
+    name = db.engine.dialect.name
+    if name == 'postgresql':
+        return postgresql
+    if name == 'sqlite':
+        return sqlite
+    raise RuntimeError(f"Atomic position updates are not supported on {name}")
+
+
+def apply_buy(user_pk, stock_pk, units, price):
+    """
+    Add units to a holding (creating it if needed) and return (units, average_buy_price).
+    """
+    stmt = _upsert_dialect().insert(portfolio_table).values(
+        user_id=user_pk, stock_id=stock_pk, units=units, average_buy_price=price)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[portfolio_table.c.user_id, portfolio_table.c.stock_id],
+        set_={
+            "units": portfolio_table.c.units + stmt.excluded.units,
+            "average_buy_price": (
+                portfolio_table.c.units * portfolio_table.c.average_buy_price
+                + stmt.excluded.units * stmt.excluded.average_buy_price
+            ) / (portfolio_table.c.units + stmt.excluded.units),
+        },
+    ).returning(portfolio_table.c.units, portfolio_table.c.average_buy_price)
+    return tuple(db.session.execute(stmt).one())
+
+
+def apply_sell(user_pk, stock_pk, units):
+    """
+    Remove units from a holding and return (units left, average_buy_price).
+    The holding is deleted when it reaches zero.
+    """
+    row = db.session.execute(
+        update(portfolio_table)
+        .where(portfolio_table.c.user_id == user_pk,
+               portfolio_table.c.stock_id == stock_pk,
+               portfolio_table.c.units >= units)
+        .values(units=portfolio_table.c.units - units)
+        .returning(portfolio_table.c.id, portfolio_table.c.units, portfolio_table.c.average_buy_price)
+    ).first()
+    if row is None:
+        raise OrderRejected("Insufficient stock units in the portfolio to sell")
+    if row.units == 0:
+        # Still under our row lock, so no concurrent buy can slip in between.
+        db.session.execute(delete(portfolio_table).where(portfolio_table.c.id == row.id))
+    return row.units, row.average_buy_price
+
+
+def add_pnl(user_pk, stock_pk, realized, units, cost):
+    """
+    Add deltas to a holding's pnl_summary row, creating it if needed.
+    """
+    now = datetime.utcnow()
+    stmt = _upsert_dialect().insert(pnl_table).values(
+        user_id=user_pk, stock_id=stock_pk, realized=realized,
+        open_units=units, open_cost=cost, updated_at=now)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[pnl_table.c.user_id, pnl_table.c.stock_id],
+        set_={
+            "realized": pnl_table.c.realized + stmt.excluded.realized,
+            "open_units": pnl_table.c.open_units + stmt.excluded.open_units,
+            "open_cost": pnl_table.c.open_cost + stmt.excluded.open_cost,
+            "updated_at": stmt.excluded.updated_at,
+        },
+    )
+    db.session.execute(stmt)
+
+
+def open_lot(user_pk, stock_pk, units, price):
+    db.session.execute(insert(lot_table).values(
+        user_id=user_pk, stock_id=stock_pk, units=units, price=price, opened_at=datetime.utcnow()))
+    add_pnl(user_pk, stock_pk, 0.0, units, units * price)
+
+
+def close_lots(user_pk, stock_pk, units, price, average_buy_price):
+    """
+    Close `units` of a holding's lots, oldest first, at `price`, and return the
+    realized P&L. Units with no lot (holdings older than the P&L tables, before
+    a backfill) are costed at the holding's average buy price.
+    """
+    # Each lot has at least one unit, so no more than `units` lots are needed.
+    lots = db.session.execute(
+        select(lot_table.c.id, lot_table.c.units, lot_table.c.price)
+        .where(lot_table.c.user_id == user_pk, lot_table.c.stock_id == stock_pk)
+        .order_by(lot_table.c.id).limit(units)
+    ).all()
+    remaining = units
+    closed_cost = 0.0
+    emptied = []
+    for lot in lots:
+        if remaining == 0:
+            break
+        matched = min(remaining, lot.units)
+        closed_cost += matched * lot.price
+        remaining -= matched
+        if matched == lot.units:
+            emptied.append(lot.id)
+        else:
+            db.session.execute(update(lot_table).where(lot_table.c.id == lot.id)
+                               .values(units=lot_table.c.units - matched))
+    if emptied:
+        db.session.execute(delete(lot_table).where(lot_table.c.id.in_(emptied)))
+
+    matched_units = units - remaining
+    realized = units * price - closed_cost - remaining * average_buy_price
+    add_pnl(user_pk, stock_pk, realized, -matched_units, -closed_cost)
+    return realized
+
+
+def apply_order(user_pk, stock_pk, transaction_type, units, price):
+    """
+    Update the holding, its lots and its P&L for one order and return the
+    Transaction row values. Does not commit.
+    """
+    if transaction_type == 'buy':
+        apply_buy(user_pk, stock_pk, units, price)
+        open_lot(user_pk, stock_pk, units, price)
+    else:
+        _, average_buy_price = apply_sell(user_pk, stock_pk, units)
+        close_lots(user_pk, stock_pk, units, price, average_buy_price)
+    return {
+        "user_id": user_pk,
+        "stock_id": stock_pk,
+        "transaction_type": transaction_type,
+        "units": units,
+        "price": price,
+    }
+
+
+def execute_order(user, stock, transaction_type, units, price):
+    """
+    Execute one market order and commit.
+    """
+    db.session.execute(insert(Transaction), [apply_order(user.id, stock.id, transaction_type, units, price)])
+    db.session.commit()
+    leaderboard.record_trades([(user.username, stock.symbol, units_delta(transaction_type, units), price)])
+
+
+def units_delta(transaction_type, units):
+    return units if transaction_type == 'buy' else -units
+
+
+def execute_batch(user, orders):
+    """
+    Execute a list of market orders for one user in a single DB transaction.
+
+    Stocks are resolved from the catalog and prices fetched with one HMGET.
+    Orders are grouped per stock and the groups run in stock id order, so
+    concurrent batches always lock holdings in the same order and cannot
+    deadlock. Within a stock the submitted order is kept, so a buy followed by
+    a sell of the same stock works. Invalid orders are rejected individually and
+    do not affect the others. Returns one result per order.
+    """
+    results = [None] * len(orders)
+    parsed = {}
+    for i, order in enumerate(orders):
+        try:
+            symbol, transaction_type, units = parse_order(order)
+            stock = stock_catalog.get_by_symbol(symbol)
+            if not stock:
+                raise OrderRejected("Stock not found")
+            parsed[i] = (stock, transaction_type, units)
+        except OrderRejected as e:
+            results[i] = {"index": i, "status": "rejected", "error": str(e)}
+
+    symbols = sorted({stock.symbol for stock, _, _ in parsed.values()})
+    prices = dict(zip(symbols, get_current_prices(symbols, fresh=True)))
+
+    transaction_rows = []
+    for i in sorted(parsed, key=lambda i: (parsed[i][0].id, i)):
+        stock, transaction_type, units = parsed[i]
+        price = prices[stock.symbol]
+        if price == "Loading...":
+            results[i] = {"index": i, "status": "rejected", "error": "Price not available yet"}
+            continue
+        price = round(float(price), 2)
+        try:
+            transaction_rows.append(apply_order(user.id, stock.id, transaction_type, units, price))
+        except OrderRejected as e:
+            results[i] = {"index": i, "status": "rejected", "error": str(e)}
+            continue
+        results[i] = {"index": i, "status": "filled", "stock_id": stock.symbol,
+                      "transaction_type": transaction_type, "units": units, "price": price}
+
+    if transaction_rows:
+        db.session.execute(insert(Transaction), transaction_rows)
+    db.session.commit()
+    leaderboard.record_trades([
+        (user.username, r["stock_id"], units_delta(r["transaction_type"], r["units"]), r["price"])
+        for r in results if r["status"] == "filled"
+    ])
+    return results
@@ -0,0 +1,69 @@
+# backend/app/services/user_ids.py
+"""
+User id allocation without serialising every signup on one row.
+
+Each process leases a block of ids from the latest_user_id row with a single
+atomic UPDATE ... RETURNING in its own short transaction, then hands ids out
+from memory. The hot row is touched once per `block_size` signups instead of
+being locked for the whole registration. Ids left in a block when a process
+exits are never reused, so usernames can have gaps.
+"""
+import os
+import threading
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+
+# Matches the starting point /register used when the table was empty.
+INITIAL_LATEST_ID = 8
+
+
+class UserIDAllocator:
+    def __init__(self, block_size=50):
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        self._next = 0
+        self._end = 0  # exclusive
+        self._pid = os.getpid()
+
+    def _lease(self, size):
+        """
+        Reserve `size` ids and return the first one. Requires an app context.
+        """
+        while True:
+            with db.engine.begin() as conn:
+                latest = conn.execute(
+                    text("UPDATE latest_user_id SET latest_id = latest_id + :size "
+                         "WHERE id = (SELECT MIN(id) FROM latest_user_id) RETURNING latest_id"),
+                    {"size": size},
+                ).scalar()
+            if latest is not None:
+                return latest - size + 1
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(text("INSERT INTO latest_user_id (id, latest_id) VALUES (1, :latest)"),
+                                 {"latest": INITIAL_LATEST_ID})
+            except IntegrityError:
+                pass  # Another process created it first; lease from that row.
+
+    def allocate(self, count=1):
+        """
+        Return `count` new, never-used user ids.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                # Blocks leased by a parent process must not be shared after fork.
+                self._next = self._end = 0
+                self._pid = os.getpid()
+            ids = []
+            while len(ids) < count:
+                if self._next >= self._end:
+                    size = max(self.block_size, count - len(ids))
+                    self._next = self._lease(size)
+                    self._end = self._next + size
+                take = min(count - len(ids), self._end - self._next)
+                ids.extend(range(self._next, self._next + take))
+                self._next += take
+            return ids
@@ -68,4 +68,8 @@ MAP = {
     "100004843": "DELHIVERY",
     "100000025": "ADANIENT",
     "100000027": "ADANIGREEN"
-}
\ No newline at end of file
+}
+
+# Compact integer ids (the TrueData symbol ids) used by binary market-data frames.
+SYMBOL_IDS = {symbol: int(td_id) for td_id, symbol in MAP.items()}
+ID_SYMBOLS = {sid: symbol for symbol, sid in SYMBOL_IDS.items()}
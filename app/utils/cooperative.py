@@ -0,0 +1,64 @@
+# backend/app/utils/cooperative.py
+"""
+Helpers for running under gevent (gunicorn's gevent worker or run.py with
+SERVE_MODE=gevent).
+
+Monkey patching makes sockets, time.sleep, threading and queue cooperative, so
+redis-py and the SSE waits yield to other greenlets. psycopg2 is a C extension
+and needs a wait callback to do the same.
+"""
+import sys
+
+
+def is_cooperative():
+    """
+    True when the stdlib has been monkey patched by gevent.
+    """
+    if "gevent" not in sys.modules:
+        return False
+    from gevent import monkey
+    return monkey.is_module_patched("socket")
+
+
+def _gevent_wait_callback(conn, timeout=None):
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import extensions, OperationalError
+
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            break
+        elif state == extensions.POLL_READ:
+            wait_read(conn.fileno(), timeout=timeout)
+        elif state == extensions.POLL_WRITE:
+            wait_write(conn.fileno(), timeout=timeout)
+        else:
+            raise OperationalError("Bad result from poll: %r" % state)
+
+
+def enable_cooperative_db():
+    """
+    Make psycopg2 yield to the gevent hub while waiting on the database.
+    Returns True if the callback was installed.
+    """
+    if not is_cooperative():
+        return False
+    from psycopg2 import extensions
+    extensions.set_wait_callback(_gevent_wait_callback)
+    return True
+
+
+def map_blocking(fn, items, max_workers=8):
+    """
+    [fn(item) for item in items] on OS threads, in parallel: the hub's pool
+    under gevent, a short-lived ThreadPoolExecutor otherwise.
+    """
+    items = list(items)
+    if not items:
+        return []
+    if is_cooperative():
+        import gevent
+        return list(gevent.get_hub().threadpool.imap(fn, items))
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as pool:
+        return list(pool.map(fn, items))
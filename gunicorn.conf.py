@@ -0,0 +1,19 @@
+# backend/gunicorn.conf.py
+# Cooperative serving mode:  gunicorn -c gunicorn.conf.py run:app
+#
+# gevent workers multiplex thousands of long-lived /stock-stream connections
+# per process; each open stream is a parked greenlet, not a pinned worker.
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+# Max simultaneous clients (streams + requests) per gevent worker.
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "5000"))
+# For async workers this only bounds how long the worker may go without
+# notifying the arbiter; long-lived streams are not affected.
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+keepalive = 75
+# Let every worker build its own app (Redis listener, catalog, threads)
+# after the fork.
+preload_app = False
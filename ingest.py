@@ -0,0 +1,82 @@
+# backend/ingest.py
+"""
+Standalone market-data ingest process.
+
+    INGEST_MODE=off gunicorn -c gunicorn.conf.py run:app   # web workers only consume
+    python ingest.py                                      # run one or more of these
+
+Several ingest processes can run for failover; they use the same Redis lock
+as the web workers, so only one holds the TrueData socket at a time. The
+leader also triggers and fills resting limit/stop orders.
+"""
+import os
+import signal
+import threading
+
+from dotenv import load_dotenv
+from flask import Flask
+
+load_dotenv()
+
+from app import (
+    db, leaderboard, order_triggers, price_fanout, redis_client, scheduler, stock_catalog,
+    update_market_status, INGEST_LEADER_KEY,
+)
+from app.services.leader import LeaderElection
+from app.services.tick_ingest import TickIngestor
+from app.services.truedata_feed import TrueDataFeed, truedata_ws_url
+from app.stocks_list import NSE_STOCK, MAP
+
+
+def make_db_app():
+    # Limit/stop fills and leaderboard rebuilds need the database, not the rest of create_app().
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL")
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    return app
+
+
+def start_ingest(feed):
+    order_triggers.start()
+    leaderboard.start()
+    feed.start()
+
+
+def stop_ingest(feed):
+    feed.stop()
+    leaderboard.stop()
+    order_triggers.stop()
+
+
+def main():
+    db_app = make_db_app()
+    order_triggers.init_app(db_app)
+    leaderboard.init_app(db_app)
+    # Order placements/cancellations (and catalog invalidations) reach us over pub/sub.
+    price_fanout.start()
+    stock_catalog.start_refresh(db_app, scheduler, float(os.getenv("CATALOG_REFRESH_SECONDS", "300")))
+
+    tick_ingestor = TickIngestor(redis_client, MAP, update_market_status,
+                                 stats_interval=float(os.getenv("INGEST_STATS_INTERVAL", "30")))
+    feed = TrueDataFeed(truedata_ws_url(), NSE_STOCK, tick_ingestor, scheduler)
+    tick_ingestor.add_tick_listener(order_triggers.on_tick)
+    tick_ingestor.add_tick_listener(leaderboard.on_tick)
+    scheduler.every(5, tick_ingestor.roll_candles, "candle-rollup")
+    election = LeaderElection(redis_client, INGEST_LEADER_KEY,
+                              on_elected=lambda: start_ingest(feed),
+                              on_demoted=lambda: stop_ingest(feed))
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stopped.set())
+    signal.signal(signal.SIGINT, lambda *_: stopped.set())
+
+    election.start()
+    print("Ingest process started, waiting for leadership...")
+    stopped.wait()
+    # Release the lock so a standby takes over immediately.
+    election.stop()
+
+
+if __name__ == "__main__":
+    main()
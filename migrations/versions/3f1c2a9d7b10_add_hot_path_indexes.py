@@ -0,0 +1,78 @@
+"""add hot path indexes and unique portfolio holding
+
+Revision ID: 3f1c2a9d7b10
+Revises: 
+Create Date: 2026-10-18 10:12:41.218304
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a9d7b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Tables may already exist (and, on fresh databases, already carry these
+# objects) because create_app() runs db.create_all() on startup.
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return name in {ix['name'] for ix in inspector.get_indexes(table)}
+
+
+def _has_unique(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return name in {uq['name'] for uq in inspector.get_unique_constraints(table)}
+
+
+def _merge_duplicate_holdings():
+    """
+    Fold duplicate (user_id, stock_id) portfolio rows into the oldest one,
+    keeping total units and the unit-weighted average buy price.
+    """
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(
+        "SELECT user_id, stock_id FROM portfolio "
+        "GROUP BY user_id, stock_id HAVING COUNT(*) > 1"
+    )).all()
+    for user_id, stock_id in duplicates:
+        rows = bind.execute(sa.text(
+            "SELECT id, units, average_buy_price FROM portfolio "
+            "WHERE user_id = :user_id AND stock_id = :stock_id ORDER BY id"
+        ), {"user_id": user_id, "stock_id": stock_id}).all()
+        units = sum(row.units for row in rows)
+        cost = sum(row.units * row.average_buy_price for row in rows)
+        keep = rows[0].id
+        bind.execute(sa.text(
+            "UPDATE portfolio SET units = :units, average_buy_price = :avg WHERE id = :id"
+        ), {"units": units, "avg": cost / units if units else 0, "id": keep})
+        bind.execute(sa.text(
+            "DELETE FROM portfolio WHERE user_id = :user_id AND stock_id = :stock_id AND id != :id"
+        ), {"user_id": user_id, "stock_id": stock_id, "id": keep})
+
+
+def upgrade():
+    if not _has_unique('portfolio', 'uq_portfolio_user_stock'):
+        _merge_duplicate_holdings()
+        with op.batch_alter_table('portfolio', schema=None) as batch_op:
+            batch_op.create_unique_constraint('uq_portfolio_user_stock', ['user_id', 'stock_id'])
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        if not _has_index('transactions', 'ix_transactions_user_created_id'):
+            batch_op.create_index('ix_transactions_user_created_id',
+                                  ['user_id', 'created_at', 'id'], unique=False)
+        if not _has_index('transactions', 'ix_transactions_user_stock_created'):
+            batch_op.create_index('ix_transactions_user_stock_created',
+                                  ['user_id', 'stock_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index('ix_transactions_user_stock_created')
+        batch_op.drop_index('ix_transactions_user_created_id')
+
+    with op.batch_alter_table('portfolio', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_portfolio_user_stock', type_='unique')
@@ -0,0 +1,60 @@
+"""add fifo lot and pnl summary tables
+
+Revision ID: 8b2e4d61c0f3
+Revises: 3f1c2a9d7b10
+Create Date: 2026-10-18 14:03:27.551902
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d61c0f3'
+down_revision = '3f1c2a9d7b10'
+branch_labels = None
+depends_on = None
+
+
+# create_app() runs db.create_all(), so the tables may already exist.
+def _has_table(name):
+    return sa.inspect(op.get_bind()).has_table(name)
+
+
+def upgrade():
+    if not _has_table('position_lots'):
+        op.create_table(
+            'position_lots',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('stock_id', sa.Integer(), nullable=False),
+            sa.Column('units', sa.Integer(), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.Column('opened_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['stock_id'], ['stocks.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_position_lots_user_stock_id', 'position_lots',
+                        ['user_id', 'stock_id', 'id'], unique=False)
+
+    if not _has_table('pnl_summary'):
+        op.create_table(
+            'pnl_summary',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('stock_id', sa.Integer(), nullable=False),
+            sa.Column('realized', sa.Float(), nullable=False),
+            sa.Column('open_units', sa.Integer(), nullable=False),
+            sa.Column('open_cost', sa.Float(), nullable=False),
+            sa.Column('updated_at', sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(['stock_id'], ['stocks.id']),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+            sa.PrimaryKeyConstraint('user_id', 'stock_id'),
+        )
+    # Fill both tables from history with: flask backfill-pnl
+
+
+def downgrade():
+    op.drop_table('pnl_summary')
+    op.drop_index('ix_position_lots_user_stock_id', table_name='position_lots')
+    op.drop_table('position_lots')
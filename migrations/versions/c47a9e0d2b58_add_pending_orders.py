@@ -0,0 +1,50 @@
+"""add pending limit/stop orders
+
+Revision ID: c47a9e0d2b58
+Revises: 8b2e4d61c0f3
+Create Date: 2026-10-18 15:26:09.114873
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c47a9e0d2b58'
+down_revision = '8b2e4d61c0f3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() runs db.create_all(), so the table may already exist.
+    if sa.inspect(op.get_bind()).has_table('pending_orders'):
+        return
+    op.create_table(
+        'pending_orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('stock_id', sa.Integer(), nullable=False),
+        sa.Column('transaction_type', sa.String(length=10), nullable=False),
+        sa.Column('order_type', sa.String(length=10), nullable=False),
+        sa.Column('units', sa.Integer(), nullable=False),
+        sa.Column('trigger_price', sa.Float(), nullable=False),
+        sa.Column('status', sa.String(length=10), nullable=False),
+        sa.Column('fill_price', sa.Float(), nullable=True),
+        sa.Column('error', sa.String(length=255), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['stock_id'], ['stocks.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_pending_orders_user_status', 'pending_orders',
+                    ['user_id', 'status', 'created_at'], unique=False)
+    op.create_index('ix_pending_orders_status_stock', 'pending_orders',
+                    ['status', 'stock_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_pending_orders_status_stock', table_name='pending_orders')
+    op.drop_index('ix_pending_orders_user_status', table_name='pending_orders')
+    op.drop_table('pending_orders')
@@ -0,0 +1,31 @@
+"""index pending_orders.updated_at for the incremental order book sync
+
+Revision ID: e5a1f3c9d284
+Revises: c47a9e0d2b58
+Create Date: 2026-10-18 18:42:10.307615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a1f3c9d284'
+down_revision = 'c47a9e0d2b58'
+branch_labels = None
+depends_on = None
+
+
+# On fresh databases create_app()'s db.create_all() already made the index.
+def _has_index(table, name):
+    inspector = sa.inspect(op.get_bind())
+    return name in {ix['name'] for ix in inspector.get_indexes(table)}
+
+
+def upgrade():
+    if not _has_index('pending_orders', 'ix_pending_orders_updated_at'):
+        op.create_index('ix_pending_orders_updated_at', 'pending_orders', ['updated_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_pending_orders_updated_at', table_name='pending_orders')
@@ -36,6 +36,10 @@ class Stock(db.Model):
 # Define the Portfolio model
 class Portfolio(db.Model):
     __tablename__ = 'portfolio'
+    __table_args__ = (
+        # One holding per (user, stock). Also serves lookups by user_id alone.
+        db.UniqueConstraint('user_id', 'stock_id', name='uq_portfolio_user_stock'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     stock_id = db.Column(db.Integer, db.ForeignKey('stocks.id'), nullable=False)
@@ -52,6 +56,11 @@ class Portfolio(db.Model):
 # Define the Transaction model
 class Transaction(db.Model):
     __tablename__ = 'transactions'
+    __table_args__ = (
+        # History is read per user, newest first, and paginated on (created_at, id).
+        db.Index('ix_transactions_user_created_id', 'user_id', 'created_at', 'id'),
+        db.Index('ix_transactions_user_stock_created', 'user_id', 'stock_id', 'created_at'),
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     stock_id = db.Column(db.Integer, db.ForeignKey('stocks.id'), nullable=False)
@@ -66,3 +75,52 @@ class Transaction(db.Model):
         self.transaction_type = transaction_type
         self.units = units
         self.price = price
+
+# FIFO cost-basis lots: one row per buy that still has units left.
+class PositionLot(db.Model):
+    __tablename__ = 'position_lots'
+    __table_args__ = (
+        # Sells consume a holding's lots oldest first.
+        db.Index('ix_position_lots_user_stock_id', 'user_id', 'stock_id', 'id'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    stock_id = db.Column(db.Integer, db.ForeignKey('stocks.id'), nullable=False)
+    units = db.Column(db.Integer, nullable=False)  # units still open
+    price = db.Column(db.Float, nullable=False)
+    opened_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+# Precomputed P&L per (user, stock), kept up to date as trades commit.
+class PnlSummary(db.Model):
+    __tablename__ = 'pnl_summary'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    stock_id = db.Column(db.Integer, db.ForeignKey('stocks.id'), primary_key=True)
+    realized = db.Column(db.Float, nullable=False, default=0.0)
+    open_units = db.Column(db.Integer, nullable=False, default=0)
+    open_cost = db.Column(db.Float, nullable=False, default=0.0)  # FIFO cost of the open units
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# Resting limit/stop orders, filled by the ingest leader when a tick crosses trigger_price.
+class PendingOrder(db.Model):
+    __tablename__ = 'pending_orders'
+    __table_args__ = (
+        db.Index('ix_pending_orders_user_status', 'user_id', 'status', 'created_at'),
+        # Loading the open book on leader start.
+        db.Index('ix_pending_orders_status_stock', 'status', 'stock_id'),
+        # Incremental book sync on the ingest leader.
+        db.Index('ix_pending_orders_updated_at', 'updated_at'),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    stock_id = db.Column(db.Integer, db.ForeignKey('stocks.id'), nullable=False)
+    transaction_type = db.Column(db.String(10), nullable=False)  # 'buy' or 'sell'
+    order_type = db.Column(db.String(10), nullable=False)  # 'limit' or 'stop'
+    units = db.Column(db.Integer, nullable=False)
+    trigger_price = db.Column(db.Float, nullable=False)
+    status = db.Column(db.String(10), nullable=False, default='open')  # open/filled/cancelled/rejected
+    fill_price = db.Column(db.Float, nullable=True)
+    error = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
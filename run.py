@@ -1,8 +1,23 @@
 # backend/run.py
+import os
+
+# SERVE_MODE=gevent serves cooperatively. Patching must happen before anything
+# imports sockets (redis, psycopg2, websocket-client).
+SERVE_MODE = os.getenv("SERVE_MODE", "threaded")
+if SERVE_MODE == "gevent":
+    from gevent import monkey
+    monkey.patch_all()
+
 from app import create_app
 
 app = create_app()
 
 if __name__ == "__main__":
     # app.run(debug=True, host='0.0.0.0', port=5000, ssl_context=('cert.pem', 'key.pem'))
-    app.run(debug=False, host='0.0.0.0', port=5000)
+    port = int(os.getenv("PORT", "5000"))
+    if SERVE_MODE == "gevent":
+        from gevent.pywsgi import WSGIServer
+        print(f"Serving cooperatively (gevent) on port {port}")
+        WSGIServer(('0.0.0.0', port), app).serve_forever()
+    else:
+        app.run(debug=False, host='0.0.0.0', port=port)
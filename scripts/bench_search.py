@@ -0,0 +1,106 @@
+# backend/scripts/bench_search.py
+"""
+Benchmark for the typeahead index behind /api/stocks/search.
+
+Builds a SearchIndex over a synthetic universe (a handful of real instruments
+plus N random symbols with random company-like names), checks that the real
+instruments rank first for exact, prefix, name and misspelled queries, and
+reports build time and per-query latency.
+
+    python scripts/bench_search.py --stocks 60000 --runs 500
+
+Price lookups (one HMGET per request) are not included.
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.catalog import CatalogEntry
+from app.services.search import SearchIndex
+
+KNOWN = [
+    ("RELIANCE", "Reliance Industries Limited"),
+    ("TCS", "Tata Consultancy Services Limited"),
+    ("INFY", "Infosys Limited"),
+    ("HDFCBANK", "HDFC Bank Limited"),
+    ("TATAMOTORS", "Tata Motors Limited"),
+]
+# query -> symbol expected in first place
+EXPECTED = {
+    "tcs": "TCS",
+    "reli": "RELIANCE",
+    "relance": "RELIANCE",
+    "infy": "INFY",
+    "hdfc bank": "HDFCBANK",
+    "consultancy": "TCS",
+    "tata cons": "TCS",
+    "tata motors": "TATAMOTORS",
+}
+SUFFIXES = ["Industries", "Services", "Bank", "India", "Motors", "Steel", "Power", "Finance",
+            "Pharma", "Chemicals", "Textiles", "Cement", "Energy", "Capital", "Infra", "Tech"]
+
+
+def universe(n, seed):
+    rng = random.Random(seed)
+    vocab = ["".join(rng.choices("abcdefghijklmnoprstuvy", k=rng.randint(4, 9))).title() for _ in range(8000)]
+    symbols = {symbol for symbol, _ in KNOWN}
+    entries = [CatalogEntry(i, str(i), symbol, name) for i, (symbol, name) in enumerate(KNOWN, 1)]
+    while len(entries) < n:
+        symbol = "".join(rng.choices(string.ascii_uppercase, k=rng.randint(3, 10)))
+        if symbol in symbols:
+            continue
+        symbols.add(symbol)
+        name = " ".join(rng.sample(vocab, rng.randint(1, 2)) + [rng.choice(SUFFIXES)])
+        entries.append(CatalogEntry(len(entries) + 1, str(len(entries) + 1), symbol,
+                                    name + rng.choice([" Limited", " Ltd", ""])))
+    return entries
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stocks", type=int, default=60000)
+    parser.add_argument("--runs", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    entries = universe(args.stocks, args.seed)
+    start = time.perf_counter()
+    index = SearchIndex(entries)
+    print(f"Indexed {len(index)} stocks in {time.perf_counter() - start:.2f}s")
+
+    queries = list(EXPECTED) + ["r", "ta", "ban", "xqzv", "limited"]
+    failures = 0
+    for query in queries:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            results = index.search(query, args.limit)
+            timings.append((time.perf_counter() - start) * 1000)
+        top = results[0][0].symbol if results else None
+        status = ""
+        if query in EXPECTED:
+            ok = top == EXPECTED[query]
+            failures += not ok
+            status = "ok" if ok else f"FAIL (expected {EXPECTED[query]})"
+        print(f"{query!r:15} p50 {percentile(timings, 50):.3f}ms  p99 {percentile(timings, 99):.3f}ms  "
+              f"top {top}  {status}")
+
+    if failures:
+        print(f"{failures} ranking check(s) failed")
+        sys.exit(1)
+    print("All ranking checks passed")
+
+
+if __name__ == "__main__":
+    main()
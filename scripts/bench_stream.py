@@ -0,0 +1,150 @@
+# backend/scripts/bench_stream.py
+"""
+End-to-end ingest and streaming benchmark against the local feed simulator.
+
+Starts scripts/truedata_sim.py in-process (ramp pattern, so every tick price
+is unique), launches the app pointed at it, opens N concurrent /stock-stream
+subscribers and measures:
+  - ticks/s sent by the simulator and ticks/s ingested by the app
+    (from the ingest:stats hash the ingest thread publishes)
+  - tick-to-client latency percentiles: time from the simulator sending a
+    tick to a subscriber receiving that price
+
+    python scripts/bench_stream.py --subscribers 200 --rate 5000 --duration 60
+
+Pass --no-spawn to benchmark an app you started yourself with
+TRUEDATA_WS_URL pointing at --sim-port and INGEST_STATS_INTERVAL=1.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis
+import requests
+
+from app.stocks_list import NSE_STOCK
+from truedata_sim import FeedSimulator
+
+
+class LatencyRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sent = {}
+        self.samples = []
+        self.frames = 0
+
+    def on_tick(self, symbol, price, sent_at):
+        self._sent[(symbol, price)] = sent_at
+
+    def on_frame(self, updates, received_at):
+        with self._lock:
+            self.frames += 1
+            for update in updates:
+                sent_at = self._sent.get((update["symbol"], update["price"]))
+                if sent_at is not None:
+                    self.samples.append(received_at - sent_at)
+
+
+def subscriber(base_url, symbols, recorder, stop):
+    url = f"{base_url}/stock-stream"
+    with requests.get(url, params={"ids": ",".join(symbols)}, stream=True, timeout=30) as resp:
+        event = None
+        first = True
+        for line in resp.iter_lines(decode_unicode=True):
+            if stop.is_set():
+                return
+            if line.startswith("event:"):
+                event = line[6:].strip()
+            elif line.startswith("data:") and event == "prices":
+                if first:
+                    # The connect snapshot is not a tick we sent.
+                    first = False
+                    continue
+                recorder.on_frame(json.loads(line[5:]), time.perf_counter())
+
+
+def ingest_stats(client):
+    stats = client.hgetall("ingest:stats")
+    return {key: float(value) for key, value in stats.items()}
+
+
+def percentile(values, p):
+    return values[min(int(p / 100 * len(values)), len(values) - 1)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--sim-port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=2000, help="simulator ticks per second")
+    parser.add_argument("--subscribers", type=int, default=50)
+    parser.add_argument("--symbols-per-subscriber", type=int, default=10)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--app-cmd", default=f"{sys.executable} run.py")
+    parser.add_argument("--no-spawn", action="store_true")
+    args = parser.parse_args()
+
+    recorder = LatencyRecorder()
+    sim = FeedSimulator(rate=args.rate, pattern="ramp", on_tick=recorder.on_tick)
+    sim_url = sim.start(port=args.sim_port)
+    print(f"simulator: {sim_url}")
+
+    app_proc = None
+    if not args.no_spawn:
+        env = dict(os.environ, TRUEDATA_WS_URL=sim_url, INGEST_STATS_INTERVAL="1")
+        app_proc = subprocess.Popen(args.app_cmd.split(), env=env,
+                                    cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    try:
+        deadline = time.time() + 60
+        while True:
+            try:
+                requests.get(f"{args.base_url}/ping", timeout=1)
+                break
+            except requests.RequestException:
+                if time.time() > deadline:
+                    raise SystemExit("app did not come up")
+                time.sleep(0.5)
+
+        stop = threading.Event()
+        for i in range(args.subscribers):
+            start = (i * args.symbols_per_subscriber) % len(NSE_STOCK)
+            symbols = [NSE_STOCK[(start + k) % len(NSE_STOCK)] for k in range(args.symbols_per_subscriber)]
+            threading.Thread(target=subscriber, args=(args.base_url, symbols, recorder, stop),
+                             daemon=True).start()
+
+        client = redis.Redis(host=os.getenv("REDIS_HOST", "localhost"),
+                             port=int(os.getenv("REDIS_PORT", "6379")), decode_responses=True)
+        time.sleep(2)  # let subscribers connect and the feed warm up
+        sent_before, stats_before, started = sim.ticks_sent, ingest_stats(client), time.time()
+        recorder.samples.clear()
+        time.sleep(args.duration)
+        sent_after, stats_after, elapsed = sim.ticks_sent, ingest_stats(client), time.time() - started
+        stop.set()
+
+        processed = stats_after.get("processed", 0) - stats_before.get("processed", 0)
+        samples = sorted(recorder.samples)
+        print(f"subscribers: {args.subscribers} x {args.symbols_per_subscriber} symbols, {elapsed:.1f}s")
+        print(f"ticks sent:      {(sent_after - sent_before) / elapsed:.0f}/s")
+        print(f"ticks ingested:  {processed / elapsed:.0f}/s  (queue depth {stats_after.get('queue_depth', 0):.0f}, "
+              f"dropped {stats_after.get('dropped', 0):.0f}, last flush {stats_after.get('last_flush_ms', 0):.2f} ms)")
+        print(f"frames received: {recorder.frames}")
+        if samples:
+            print(f"tick->client latency ms: p50={percentile(samples, 50):.1f} p90={percentile(samples, 90):.1f} "
+                  f"p99={percentile(samples, 99):.1f} max={samples[-1] * 1000:.1f} (n={len(samples)})")
+        else:
+            print("no latency samples collected")
+    finally:
+        if app_proc:
+            app_proc.terminate()
+            app_proc.wait()
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
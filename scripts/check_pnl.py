@@ -0,0 +1,118 @@
+# backend/scripts/check_pnl.py
+"""
+Checks the vectorized FIFO matcher used by `flask backfill-pnl` against a
+plain one-lot-at-a-time FIFO replay on random trade histories (including
+oversells), then times it on a large synthetic transactions table.
+
+    python scripts/check_pnl.py --histories 500 --rows 2000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from collections import defaultdict, deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from app.services.pnl import fifo_pnl
+
+
+def replay(rows):
+    """
+    Reference FIFO: {(user, stock): (realized, open_units, open_cost)}.
+    """
+    realized = {}
+    lots = defaultdict(deque)
+    for user, stock, is_buy, units, price in rows:
+        key = (user, stock)
+        realized.setdefault(key, 0.0)
+        if is_buy:
+            lots[key].append([units, price])
+            continue
+        while units and lots[key]:
+            lot = lots[key][0]
+            matched = min(units, lot[0])
+            realized[key] += matched * (price - lot[1])
+            lot[0] -= matched
+            units -= matched
+            if lot[0] == 0:
+                lots[key].popleft()
+    return {
+        key: (value, sum(l[0] for l in lots[key]), sum(l[0] * l[1] for l in lots[key]))
+        for key, value in realized.items()
+    }
+
+
+def random_history(rng):
+    rows = []
+    for user in range(rng.randint(1, 5)):
+        for stock in range(rng.randint(1, 4)):
+            held = 0
+            for _ in range(rng.randint(1, 15)):
+                if held and rng.random() < 0.45:
+                    # Occasionally sell more than is held.
+                    units = rng.randint(1, held + (3 if rng.random() < 0.1 else 0))
+                    held = max(0, held - units)
+                    rows.append((user, stock, False, units, round(rng.uniform(50, 150), 2)))
+                else:
+                    units = rng.randint(1, 20)
+                    held += units
+                    rows.append((user, stock, True, units, round(rng.uniform(50, 150), 2)))
+    return rows
+
+
+def check(histories, seed):
+    rng = random.Random(seed)
+    for _ in range(histories):
+        rows = random_history(rng)
+        columns = list(zip(*rows))
+        summary, lots = fifo_pnl(*(np.array(c) for c in columns))
+        expected = replay(rows)
+        for i in range(len(summary["user_id"])):
+            key = (int(summary["user_id"][i]), int(summary["stock_id"][i]))
+            got = (summary["realized"][i], summary["open_units"][i], summary["open_cost"][i])
+            want = expected[key]
+            if abs(got[0] - want[0]) > 1e-6 or got[1] != want[1] or abs(got[2] - want[2]) > 1e-6:
+                print(f"MISMATCH for {key}: got {got}, expected {want}")
+                return False
+        if int(lots["units"].sum()) != sum(v[1] for v in expected.values()):
+            print("MISMATCH in open lot units")
+            return False
+    print(f"{histories} random histories match the FIFO replay")
+    return True
+
+
+def bench(n, users, stocks):
+    rng = np.random.default_rng(0)
+    user_ids = rng.integers(0, users, n)
+    stock_ids = rng.integers(0, stocks, n)
+    order = np.lexsort((stock_ids, user_ids))
+    is_buy = rng.random(n) < 0.6
+    units = rng.integers(1, 10, n)
+    prices = rng.random(n) * 1000
+    started = time.perf_counter()
+    summary, lots = fifo_pnl(user_ids[order], stock_ids[order], is_buy, units, prices)
+    elapsed = time.perf_counter() - started
+    print(f"{n} transactions, {len(summary['user_id'])} holdings, {len(lots['row'])} open lots "
+          f"in {elapsed:.2f}s ({n / elapsed:,.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--histories", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=2000000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--stocks", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    if not check(args.histories, args.seed):
+        sys.exit(1)
+    bench(args.rows, args.users, args.stocks)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# backend/scripts/check_single_ingest.py
+"""
+Checks that market-data ingest runs exactly once, whatever the number of
+processes competing for it, and that it fails over.
+
+Starts the feed simulator, launches N `ingest.py` processes against it, then
+checks:
+  1. the simulator sees exactly one TrueData connection
+  2. every tick sent is written to Redis exactly once (the ticks:{symbol}
+     history streams get one entry per ingested tick)
+  3. after killing the leader, another process reconnects within the lock TTL
+
+    python scripts/check_single_ingest.py --workers 4
+
+Uses the Redis at REDIS_HOST/REDIS_PORT and clears its ticks:* keys.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import redis
+
+from app.stocks_list import NSE_STOCK
+from truedata_sim import FeedSimulator
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LEADER_KEY = "ingest:leader"
+
+
+def wait_for(predicate, timeout):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def total_ticks(client):
+    pipe = client.pipeline(transaction=False)
+    for symbol in NSE_STOCK:
+        pipe.xlen(f"ticks:{symbol}")
+    return sum(pipe.execute())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rate", type=float, default=200)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--sim-port", type=int, default=8766)
+    args = parser.parse_args()
+
+    client = redis.Redis(host=os.getenv("REDIS_HOST", "localhost"),
+                         port=int(os.getenv("REDIS_PORT", "6379")), decode_responses=True)
+    client.delete(LEADER_KEY, *[f"ticks:{symbol}" for symbol in NSE_STOCK])
+
+    sim = FeedSimulator(rate=args.rate)
+    sim_url = sim.start(port=args.sim_port)
+    env = dict(os.environ, TRUEDATA_WS_URL=sim_url)
+    procs = [subprocess.Popen([sys.executable, "ingest.py"], cwd=ROOT, env=env)
+             for _ in range(args.workers)]
+    failures = []
+    try:
+        if not wait_for(lambda: sim.active_connections >= 1, 30):
+            raise SystemExit("no ingest process connected")
+        time.sleep(2)
+        if sim.active_connections != 1:
+            failures.append(f"{sim.active_connections} concurrent feed connections, expected 1")
+
+        # Pause briefly so in-flight ticks are flushed before comparing counts.
+        sent_before, stored_before = sim.ticks_sent, total_ticks(client)
+        time.sleep(args.duration)
+        sent = sim.ticks_sent - sent_before
+        time.sleep(1)
+        stored = total_ticks(client) - stored_before
+        print(f"ticks sent: {sent}  ticks written: {stored}")
+        # Ticks in flight at the window edges may land on either side.
+        if abs(stored - sent) > args.rate * 0.5:
+            failures.append(f"{stored} ticks written for {sent} sent; expected one write per tick")
+
+        leader = client.get(LEADER_KEY)
+        leader_pid = int(leader.split(":")[1])
+        print(f"killing leader pid {leader_pid}")
+        os.kill(leader_pid, signal.SIGKILL)
+        reconnects_before = sim.connections_total
+        if not wait_for(lambda: sim.connections_total > reconnects_before, 30):
+            failures.append("no failover within 30s")
+        else:
+            time.sleep(2)
+            if sim.active_connections != 1:
+                failures.append(f"{sim.active_connections} feed connections after failover, expected 1")
+            print(f"failover ok, new leader: {client.get(LEADER_KEY)}")
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.terminate()
+        for proc in procs:
+            proc.wait()
+        sim.stop()
+
+    for failure in failures:
+        print("FAIL", failure)
+    print("PASS" if not failures else "FAIL")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
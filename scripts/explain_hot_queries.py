@@ -0,0 +1,76 @@
+# backend/scripts/explain_hot_queries.py
+"""
+Checks that the hot query shapes behind /trade, /get_portfolio,
+/portfolio_value and /get_transactions are served by index lookups.
+
+Runs EXPLAIN against DATABASE_URL (PostgreSQL) with sequential scans
+disabled, so any plan that still contains a Seq Scan on these tables has no
+usable index. Exits non-zero if one is found.
+
+    python scripts/explain_hot_queries.py
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+from flask import Flask
+from sqlalchemy import select, text, tuple_
+
+from models import db, User, Portfolio, Transaction
+
+HOT_TABLES = ("users", "portfolio", "transactions")
+
+
+def hot_queries():
+    return {
+        "user by username": select(User).where(User.username == "user-0001"),
+        "holding by (user, stock)": select(Portfolio).where(
+            Portfolio.user_id == 1, Portfolio.stock_id == 1),
+        "portfolio by username": select(Portfolio.stock_id, Portfolio.units, Portfolio.average_buy_price)
+            .join(User, Portfolio.user_id == User.id)
+            .where(User.username == "user-0001"),
+        "transactions page": select(Transaction)
+            .where(Transaction.user_id == 1)
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+            .limit(50),
+        "transactions next page": select(Transaction)
+            .where(Transaction.user_id == 1,
+                   tuple_(Transaction.created_at, Transaction.id) < ("2025-01-01 00:00:00", 1000))
+            .order_by(Transaction.created_at.desc(), Transaction.id.desc())
+            .limit(50),
+        "transactions by symbol": select(Transaction)
+            .where(Transaction.user_id == 1, Transaction.stock_id == 1)
+            .order_by(Transaction.created_at.desc()),
+    }
+
+
+def main():
+    load_dotenv()
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL")
+    db.init_app(app)
+
+    failures = 0
+    with app.app_context():
+        dialect = db.engine.dialect
+        with db.engine.connect() as conn:
+            conn.execute(text("SET enable_seqscan = off"))
+            for name, stmt in hot_queries().items():
+                sql = str(stmt.compile(dialect=dialect, compile_kwargs={"literal_binds": True}))
+                plan = [row[0] for row in conn.execute(text("EXPLAIN " + sql))]
+                scans = [line for line in plan
+                         if "Seq Scan" in line and any(f" on {t}" in line for t in HOT_TABLES)]
+                print(("FAIL " if scans else "ok   ") + name)
+                for line in plan:
+                    print("      " + line)
+                failures += bool(scans)
+
+    if failures:
+        print(f"{failures} hot queries fall back to sequential scans")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
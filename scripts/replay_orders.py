@@ -0,0 +1,148 @@
+# backend/scripts/replay_orders.py
+"""
+Replay benchmark for the limit/stop trigger book.
+
+Rests N orders (limit and stop, buy and sell) on a set of symbols, cancels
+some of them, then replays a random-walk tick stream through
+TriggerBook.cross() and checks that:
+  1. every order fires on the first tick that crosses its trigger, and no other
+  2. cancelled orders never fire
+  3. orders whose trigger is never crossed stay resting
+It reports per-tick trigger latency, and the cost of the naive scan over all
+resting orders for comparison.
+
+    python scripts/replay_orders.py --orders 100000 --ticks 200000 --symbols 50
+
+Fills themselves go through trading.apply_order behind a conditional status
+update; this only exercises the in-memory trigger path.
+"""
+import argparse
+import bisect
+import os
+import random
+import sys
+import time
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.order_book import BELOW, TriggerBook, trigger_side
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=100000)
+    parser.add_argument("--ticks", type=int, default=200000)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--cancel", type=float, default=0.1, help="fraction of orders cancelled before the replay")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    start_price = {symbol: rng.uniform(100, 3000) for symbol in symbols}
+
+    # Tick stream: a random walk per symbol, interleaved.
+    ticks = []
+    prices = dict(start_price)
+    for _ in range(args.ticks):
+        symbol = rng.choice(symbols)
+        prices[symbol] = round(max(1.0, prices[symbol] * (1 + rng.gauss(0, 0.002))), 2)
+        ticks.append((symbol, prices[symbol]))
+
+    book = TriggerBook()
+    orders = {}
+    for order_id in range(1, args.orders + 1):
+        symbol = rng.choice(symbols)
+        transaction_type = rng.choice(("buy", "sell"))
+        order_type = rng.choice(("limit", "stop"))
+        side = trigger_side(transaction_type, order_type)
+        # Resting orders sit on the far side of the market.
+        offset = rng.uniform(0.001, 0.05) * start_price[symbol]
+        trigger = round(start_price[symbol] - offset if side == BELOW else start_price[symbol] + offset, 2)
+        orders[order_id] = (symbol, side, trigger)
+        book.add(order_id, symbol, side, trigger)
+
+    cancelled = set(rng.sample(sorted(orders), int(args.orders * args.cancel)))
+    for order_id in cancelled:
+        book.cancel(order_id)
+
+    # Expected first crossing per order, from running min/max of each symbol's ticks.
+    per_symbol = {symbol: ([], []) for symbol in symbols}  # symbol -> (tick indexes, prices)
+    for i, (symbol, price) in enumerate(ticks):
+        per_symbol[symbol][0].append(i)
+        per_symbol[symbol][1].append(price)
+    running = {}
+    for symbol, (_, series) in per_symbol.items():
+        # Negated running min is non-decreasing, so both can be bisected.
+        running[symbol] = ([-p for p in accumulate(series, min)], list(accumulate(series, max)))
+    expected = {}
+    for order_id, (symbol, side, trigger) in orders.items():
+        if order_id in cancelled:
+            continue
+        neg_min, run_max = running[symbol]
+        if side == BELOW:
+            k = bisect.bisect_left(neg_min, -trigger)
+        else:
+            k = bisect.bisect_left(run_max, trigger)
+        if k < len(run_max):
+            expected[order_id] = per_symbol[symbol][0][k]
+
+    fired_at = {}
+    latencies = []
+    for i, (symbol, price) in enumerate(ticks):
+        started = time.perf_counter()
+        fired = book.cross(symbol, price)
+        latencies.append(time.perf_counter() - started)
+        for order_id in fired:
+            if order_id in fired_at:
+                print(f"FAIL: order {order_id} fired twice")
+                sys.exit(1)
+            fired_at[order_id] = i
+
+    errors = 0
+    for order_id, tick in fired_at.items():
+        if order_id in cancelled:
+            errors += 1
+            print(f"FAIL: cancelled order {order_id} fired at tick {tick}")
+        elif expected.get(order_id) != tick:
+            errors += 1
+            print(f"FAIL: order {order_id} fired at tick {tick}, expected {expected.get(order_id)}")
+    missed = set(expected) - set(fired_at)
+    for order_id in list(missed)[:10]:
+        print(f"FAIL: order {order_id} should have fired at tick {expected[order_id]}")
+    errors += len(missed)
+    resting = args.orders - len(cancelled) - len(fired_at)
+    if len(book) != resting:
+        errors += 1
+        print(f"FAIL: book holds {len(book)} orders, expected {resting}")
+
+    # The naive alternative: scan every resting order of the symbol on each tick.
+    by_symbol = {}
+    for order_id, (symbol, side, trigger) in orders.items():
+        by_symbol.setdefault(symbol, []).append((side, trigger))
+    sample = ticks[:2000]
+    started = time.perf_counter()
+    for symbol, price in sample:
+        [1 for side, trigger in by_symbol[symbol]
+         if (price <= trigger if side == BELOW else price >= trigger)]
+    scan_us = (time.perf_counter() - started) / len(sample) * 1e6
+
+    micro = [l * 1e6 for l in latencies]
+    print(f"{args.orders} orders ({len(cancelled)} cancelled), {args.ticks} ticks on {args.symbols} symbols")
+    print(f"fills: {len(fired_at)} (expected {len(expected)}), still resting: {len(book)}")
+    print(f"cross() per tick: p50 {percentile(micro, 50):.1f}us  p99 {percentile(micro, 99):.1f}us  "
+          f"max {max(micro):.1f}us  (naive scan: {scan_us:.1f}us/tick)")
+    if errors:
+        print(f"{errors} errors")
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# backend/scripts/stress_trades.py
+"""
+Concurrency stress test for position updates.
+
+Fires parallel buys and sells of one unit at a single holding through
+/api/stocks/trade and checks that the final holding matches the filled
+orders (no lost updates), then reports throughput and latency.
+
+    python scripts/stress_trades.py --base-url http://localhost:5000 \
+        --user user-0009 --symbol RELIANCE --buys 500 --sells 300 --concurrency 32
+
+Point it at a server running several gunicorn workers to exercise
+cross-process contention.
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+
+def holding_units(session, base_url, user, symbol):
+    resp = session.get(f"{base_url}/api/stocks/get_portfolio", params={"user_id": user})
+    if resp.status_code == 404:
+        return 0
+    resp.raise_for_status()
+    for entry in resp.json()["portfolio"]:
+        if entry["stock_id"] == symbol:
+            return entry["units"]
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--symbol", default="RELIANCE")
+    parser.add_argument("--buys", type=int, default=500)
+    parser.add_argument("--sells", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    session = requests.Session()
+    url = f"{args.base_url}/api/stocks/trade"
+
+    # Make sure every sell can be covered even if it runs before all buys.
+    seed = max(args.sells - holding_units(session, args.base_url, args.user, args.symbol), 0)
+    if seed:
+        session.post(url, json={"user_id": args.user, "stock_id": args.symbol,
+                                "transaction_type": "buy", "units": seed}).raise_for_status()
+    before = holding_units(session, args.base_url, args.user, args.symbol)
+
+    orders = ["buy"] * args.buys + ["sell"] * args.sells
+    random.shuffle(orders)
+
+    def place(side):
+        started = time.perf_counter()
+        resp = requests.post(url, json={"user_id": args.user, "stock_id": args.symbol,
+                                        "transaction_type": side, "units": 1})
+        return side, resp.status_code, time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(place, orders))
+    elapsed = time.perf_counter() - started
+
+    filled_buys = sum(1 for side, status, _ in results if side == "buy" and status == 201)
+    filled_sells = sum(1 for side, status, _ in results if side == "sell" and status == 201)
+    failed = [r for r in results if r[1] != 201]
+    after = holding_units(session, args.base_url, args.user, args.symbol)
+    expected = before + filled_buys - filled_sells
+
+    latencies = sorted(latency for _, _, latency in results)
+    pct = lambda p: latencies[min(int(p / 100 * len(latencies)), len(latencies) - 1)] * 1000
+    print(f"orders: {len(orders)}  filled buys: {filled_buys}  filled sells: {filled_sells}  failed: {len(failed)}")
+    print(f"throughput: {len(orders) / elapsed:.1f} orders/s over {elapsed:.2f}s")
+    print(f"latency ms: p50={pct(50):.1f} p95={pct(95):.1f} p99={pct(99):.1f} max={latencies[-1] * 1000:.1f}")
+    print(f"units before: {before}  after: {after}  expected: {expected}")
+
+    ok = after == expected and not failed
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# backend/scripts/truedata_sim.py
+"""
+Local stand-in for the TrueData real-time WebSocket feed.
+
+Speaks the subset of the protocol start_truedata_ws uses:
+  - {"method": "addsymbol", "symbols": [...]}  -> symbols-added ack with symbollist
+  - {"method": "getmarketstatus"}              -> {"NSE_EQ": "OPEN", ...}
+  - a stream of {"trade": [...]} messages for the subscribed symbols
+
+Ticks are synthetic (random walk, or a strictly rising ramp that makes every
+price unique, which the benchmark uses to match ticks to client frames) or
+replayed from a file with one trade array or {"trade": [...]} message per line.
+
+    python scripts/truedata_sim.py --port 8765 --rate 5000
+    TRUEDATA_WS_URL=ws://127.0.0.1:8765 python run.py
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask_sock import Sock
+from simple_websocket import ConnectionClosed
+from werkzeug.serving import make_server
+
+from app.stocks_list import MAP
+
+SYMBOL_TO_TD_ID = {symbol: td_id for td_id, symbol in MAP.items()}
+
+
+def _trade_array(td_id, price, volume):
+    ts = datetime.now().isoformat(timespec="seconds")
+    price = f"{price:.2f}"
+    # [id, ts, ltp, ltq, atp, ttq, open, high, low, prev_close, oi, prev_oi,
+    #  turnover, bid, bid_qty, ask, ask_qty]
+    return [td_id, ts, price, str(volume), price, str(volume), price, price, price,
+            price, "0", "0", "0", price, "0", price, "0"]
+
+
+class FeedSimulator:
+    def __init__(self, rate=1000, pattern="walk", replay=None, market_status="OPEN",
+                 batch_interval=0.01, on_tick=None):
+        self.rate = rate
+        self.pattern = pattern
+        self.replay = replay
+        self.market_status = market_status
+        self.batch_interval = batch_interval
+        # Called as on_tick(symbol, price_str, sent_at) for every tick sent.
+        self.on_tick = on_tick
+        self.ticks_sent = 0
+        self.active_connections = 0
+        self.connections_total = 0
+        self._server = None
+
+    def _synthetic(self, symbols):
+        prices = {symbol: random.uniform(100, 3000) for symbol in symbols}
+        step = 0
+        while True:
+            symbol = symbols[step % len(symbols)]
+            if self.pattern == "ramp":
+                prices[symbol] += 0.01
+            else:
+                prices[symbol] = max(prices[symbol] * (1 + random.gauss(0, 0.0005)), 0.05)
+            step += 1
+            yield _trade_array(SYMBOL_TO_TD_ID[symbol], prices[symbol], random.randint(1, 500))
+
+    def _replayed(self):
+        while True:
+            with open(self.replay) as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        data = json.loads(line)
+                        yield data["trade"] if isinstance(data, dict) else data
+
+    def _symbol_list(self, symbols):
+        ack = []
+        for symbol in symbols:
+            td_id = SYMBOL_TO_TD_ID.get(symbol)
+            if td_id is None:
+                continue
+            price = f"{random.uniform(100, 3000):.2f}"
+            ack.append([symbol, td_id, datetime.now().isoformat(timespec="seconds"), price,
+                        "0", price, "0", price, price, price, price, "0", "0", "0",
+                        price, "0", price, "0"])
+        return ack
+
+    def handle(self, ws):
+        self.active_connections += 1
+        self.connections_total += 1
+        ws.send(json.dumps({"success": True, "message": "TrueData Real Time Data Service (simulator)"}))
+        symbols = []
+        stop = threading.Event()
+
+        def pump():
+            source = self._replayed() if self.replay else self._synthetic(symbols)
+            per_batch = max(int(self.rate * self.batch_interval), 1)
+            next_batch = time.perf_counter()
+            try:
+                while not stop.is_set():
+                    for _ in range(per_batch):
+                        trade = next(source)
+                        sent_at = time.perf_counter()
+                        ws.send(json.dumps({"trade": trade}))
+                        self.ticks_sent += 1
+                        if self.on_tick:
+                            self.on_tick(MAP.get(trade[0]), trade[2], sent_at)
+                    next_batch += self.batch_interval
+                    time.sleep(max(next_batch - time.perf_counter(), 0))
+            except ConnectionClosed:
+                stop.set()
+
+        try:
+            while True:
+                data = json.loads(ws.receive())
+                method = data.get("method")
+                if method == "addsymbol":
+                    added = [s for s in data.get("symbols", []) if s in SYMBOL_TO_TD_ID]
+                    ws.send(json.dumps({
+                        "success": True, "message": "symbols added",
+                        "symbolsadded": len(added), "symbollist": self._symbol_list(added),
+                        "totalsymbolsubscribed": len(added),
+                    }))
+                    if not symbols and added:
+                        symbols.extend(added)
+                        threading.Thread(target=pump, daemon=True).start()
+                elif method == "getmarketstatus":
+                    ws.send(json.dumps({
+                        "success": True, "message": "marketstatus",
+                        "NSE_EQ": self.market_status, "NSE_FO": self.market_status,
+                    }))
+        except ConnectionClosed:
+            pass
+        finally:
+            stop.set()
+            self.active_connections -= 1
+
+    def start(self, host="127.0.0.1", port=8765):
+        """
+        Serve in a background thread and return the ws:// URL.
+        """
+        app = Flask(__name__)
+        sock = Sock(app)
+        sock.route("/")(self.handle)
+        self._server = make_server(host, port, app, threaded=True)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return f"ws://{host}:{port}/?user=sim&password=sim"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=float, default=1000, help="ticks per second per connection")
+    parser.add_argument("--pattern", choices=["walk", "ramp"], default="walk")
+    parser.add_argument("--replay", help="file of recorded trade arrays, one per line")
+    parser.add_argument("--market-status", default="OPEN")
+    args = parser.parse_args()
+
+    sim = FeedSimulator(rate=args.rate, pattern=args.pattern, replay=args.replay,
+                        market_status=args.market_status)
+    url = sim.start(args.host, args.port)
+    print(f"TrueData simulator listening on {url} at {args.rate:g} ticks/s")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"ticks sent: {sim.ticks_sent}")
+    except KeyboardInterrupt:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
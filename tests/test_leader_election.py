@@ -0,0 +1,115 @@
+"""
+LeaderElection against an in-memory Redis, with a short TTL.
+"""
+import time
+
+import pytest
+
+from app.services.leader import LeaderElection
+
+TTL = 0.3
+
+
+class Candidate:
+    """
+    A LeaderElection that records its elected/demoted callbacks.
+    """
+
+    def __init__(self, redis_client, key="test:leader"):
+        self.events = []
+        self.election = LeaderElection(
+            redis_client, key,
+            on_elected=lambda: self.events.append("elected"),
+            on_demoted=lambda: self.events.append("demoted"),
+            ttl=TTL,
+        )
+
+
+def wait_until(predicate, timeout=5):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return
+        time.sleep(0.01)
+    pytest.fail(f"condition not met after {timeout}s")
+
+
+@pytest.fixture
+def candidates(redis_client):
+    started = []
+
+    def make():
+        candidate = Candidate(redis_client)
+        started.append(candidate)
+        return candidate
+
+    yield make
+    for candidate in started:
+        candidate.election.stop()
+
+
+def test_first_candidate_takes_the_lock(redis_client, candidates):
+    a = candidates()
+    a.election.start()
+
+    wait_until(lambda: a.election.is_leader)
+    assert redis_client.get("test:leader") == a.election.token
+    assert a.events == ["elected"]
+
+
+def test_leader_renews_the_lock(redis_client, candidates):
+    a = candidates()
+    a.election.start()
+    wait_until(lambda: a.election.is_leader)
+
+    # Well past the TTL: only renewals keep the key alive.
+    time.sleep(TTL * 4)
+    assert a.election.is_leader
+    assert redis_client.get("test:leader") == a.election.token
+    assert redis_client.pttl("test:leader") > 0
+    assert a.events == ["elected"]
+
+
+def test_leader_steps_down_when_the_lock_is_taken(redis_client, candidates):
+    a = candidates()
+    a.election.start()
+    wait_until(lambda: a.election.is_leader)
+
+    redis_client.set("test:leader", "someone-else", px=60000)
+
+    wait_until(lambda: not a.election.is_leader)
+    assert a.events == ["elected", "demoted"]
+    # The other owner's lock is left alone.
+    time.sleep(TTL)
+    assert redis_client.get("test:leader") == "someone-else"
+    assert not a.election.is_leader
+
+
+def test_standby_takes_over_when_the_leader_stops(redis_client, candidates):
+    a, b = candidates(), candidates()
+    a.election.start()
+    wait_until(lambda: a.election.is_leader)
+    b.election.start()
+    time.sleep(TTL)
+    assert not b.election.is_leader
+
+    a.election.stop()
+
+    assert a.events == ["elected", "demoted"]
+    wait_until(lambda: b.election.is_leader)
+    assert redis_client.get("test:leader") == b.election.token
+
+
+def test_standby_takes_over_when_the_leader_dies(redis_client, candidates):
+    a, b = candidates(), candidates()
+    a.election.start()
+    wait_until(lambda: a.election.is_leader)
+    b.election.start()
+
+    # A dead process stops renewing without releasing; the lock has to expire.
+    a.election._stop.set()
+    a.election._thread.join()
+
+    wait_until(lambda: b.election.is_leader, timeout=TTL * 5)
+    assert redis_client.get("test:leader") == b.election.token
+    assert b.events == ["elected"]
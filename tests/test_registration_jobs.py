@@ -0,0 +1,201 @@
+"""
+Provisioning jobs run against LocalFirebaseGateway and an in-memory Redis.
+"""
+import json
+import time
+
+import bcrypt
+import pytest
+
+from app.services import registration
+from app.services.firebase_gateway import LocalFirebaseGateway
+from app.services.jobs import JobQueue
+from app.utils.cooperative import map_blocking
+from app.services.registration import (
+    PROVISION_USERS_JOB, hash_password, make_provision_handler, new_account, new_accounts
+)
+
+
+@pytest.fixture(autouse=True)
+def cheap_bcrypt(monkeypatch):
+    monkeypatch.setattr(registration, "BCRYPT_ROUNDS", 4)
+
+
+class FlakyGateway(LocalFirebaseGateway):
+    """
+    Fails add_children `failures` times, then behaves.
+    """
+
+    def __init__(self, failures):
+        super().__init__()
+        self.failures = failures
+        self.imports = 0
+
+    def import_users(self, users):
+        self.imports += 1
+        super().import_users(users)
+
+    def add_children(self, master_id, child_ids):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("relationships unavailable")
+        super().add_children(master_id, child_ids)
+
+
+def make_queue(redis_client, gateway, **kwargs):
+    queue = JobQueue(redis_client, name="test", backoff=0.01, **kwargs)
+    queue.register(PROVISION_USERS_JOB, make_provision_handler(gateway))
+    return queue
+
+
+def register(queue, master_id, *accounts):
+    return queue.enqueue(PROVISION_USERS_JOB, {"master_id": master_id, "users": list(accounts)})
+
+
+def assert_no_plaintext(redis_client, job_id):
+    payload = json.loads(redis_client.hget(f"job:{job_id}", "payload"))
+    for account in payload["users"]:
+        assert "password" not in account
+        assert account["password_hash"].startswith("$2")
+
+
+def wait_for(queue, job_id, statuses=("done", "failed"), timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = queue.status(job_id)
+        if status["status"] in statuses:
+            return status
+        time.sleep(0.01)
+    pytest.fail(f"job {job_id} still {queue.status(job_id)['status']} after {timeout}s")
+
+
+def test_registration_is_provisioned_through_the_gateway(redis_client):
+    gateway = LocalFirebaseGateway()
+    queue = make_queue(redis_client, gateway)
+    account = new_account(7, hash_password("s3cret"), "Ada", "Lovelace")
+    job_id = register(queue, "master-1", account)
+    assert_no_plaintext(redis_client, job_id)
+
+    queue.start()
+    try:
+        status = wait_for(queue, job_id)
+    finally:
+        queue.stop()
+
+    assert status["status"] == "done"
+    assert status["state"] == {"auth": True, "profiles": True, "relationships": True}
+    auth_user = gateway.auth_users[account["uid"]]
+    assert auth_user["email"] == "user-0007@stocksapp.com"
+    assert bcrypt.checkpw(b"s3cret", auth_user["password_hash"].encode())
+    assert gateway.users["user-0007"]["firstName"] == "Ada"
+    assert gateway.relationships["master-1"] == [{"userId": "user-0007"}]
+    assert_no_plaintext(redis_client, job_id)
+    assert redis_client.llen(f"jobs:test:processing:{queue.worker_id}") == 0
+
+
+def test_bulk_registration_imports_every_hash(redis_client):
+    gateway = LocalFirebaseGateway()
+    queue = make_queue(redis_client, gateway)
+    specs = [{"password": f"pw{n}", "firstName": f"F{n}"} for n in range(20)]
+    hashes = map_blocking(hash_password, [spec["password"] for spec in specs])
+    accounts = new_accounts(range(100, 120), specs, hashes)
+    job_id = register(queue, "master-2", *accounts)
+    assert_no_plaintext(redis_client, job_id)
+
+    queue.start()
+    try:
+        status = wait_for(queue, job_id)
+    finally:
+        queue.stop()
+
+    assert status["status"] == "done"
+    for n, account in enumerate(accounts):
+        password_hash = gateway.auth_users[account["uid"]]["password_hash"]
+        assert bcrypt.checkpw(f"pw{n}".encode(), password_hash.encode())
+    assert len(gateway.relationships["master-2"]) == 20
+    assert_no_plaintext(redis_client, job_id)
+
+
+def test_retry_resumes_after_the_last_finished_step(redis_client):
+    gateway = FlakyGateway(failures=1)
+    queue = make_queue(redis_client, gateway)
+    job_id = register(queue, "master-1", new_account(8, hash_password("pw")))
+
+    queue.start()
+    try:
+        status = wait_for(queue, job_id)
+    finally:
+        queue.stop()
+
+    assert status["status"] == "done"
+    assert status["attempts"] == 2
+    # The payload is saved again after the failed attempt.
+    assert_no_plaintext(redis_client, job_id)
+    assert gateway.imports == 1
+    assert gateway.relationships["master-1"] == [{"userId": "user-0008"}]
+
+
+def test_job_fails_after_max_attempts(redis_client):
+    gateway = FlakyGateway(failures=10)
+    queue = make_queue(redis_client, gateway, max_attempts=2)
+    job_id = register(queue, "master-1", new_account(9, hash_password("pw")))
+
+    queue.start()
+    try:
+        status = wait_for(queue, job_id)
+    finally:
+        queue.stop()
+
+    assert status["status"] == "failed"
+    assert status["attempts"] == 2
+    assert status["error"] == "relationships unavailable"
+    assert status["state"] == {"auth": True, "profiles": True}
+    assert gateway.relationships == {}
+
+
+def test_job_taken_by_a_dead_worker_is_requeued(redis_client):
+    gateway = LocalFirebaseGateway()
+    queue = make_queue(redis_client, gateway)
+    job_id = register(queue, "master-1", new_account(10, hash_password("pw")))
+    # A worker took the job and died: no heartbeat, job left in its processing list.
+    redis_client.sadd("jobs:test:workers", "dead-worker")
+    redis_client.lmove("jobs:test", "jobs:test:processing:dead-worker", "RIGHT", "LEFT")
+    redis_client.hset(f"job:{job_id}", "status", "running")
+
+    queue.start()
+    try:
+        status = wait_for(queue, job_id)
+    finally:
+        queue.stop()
+
+    assert status["status"] == "done"
+    assert "user-00010" in gateway.users
+    assert redis_client.llen("jobs:test:processing:dead-worker") == 0
+    assert not redis_client.sismember("jobs:test:workers", "dead-worker")
+
+
+def test_job_of_a_live_worker_is_left_alone(redis_client):
+    queue = make_queue(redis_client, LocalFirebaseGateway())
+    job_id = register(queue, "master-1", new_account(11, hash_password("pw")))
+    redis_client.sadd("jobs:test:workers", "busy-worker")
+    redis_client.set("jobs:test:worker:busy-worker", time.time(), ex=60)
+    redis_client.lmove("jobs:test", "jobs:test:processing:busy-worker", "RIGHT", "LEFT")
+
+    assert queue.recover() == 0
+    assert redis_client.lrange("jobs:test:processing:busy-worker", 0, -1) == [job_id]
+
+
+def test_master_is_reported_once_linked(redis_client):
+    linked = []
+    queue = JobQueue(redis_client, name="test", backoff=0.01)
+    queue.register(PROVISION_USERS_JOB, make_provision_handler(
+        FlakyGateway(failures=1), on_linked=lambda usernames, master_id: linked.append((usernames, master_id))))
+    job_id = register(queue, "master-3", new_account(12, hash_password("pw")))
+
+    queue.start()
+    try:
+        wait_for(queue, job_id)
+    finally:
+        queue.stop()
+
+    assert linked == [(["user-00012"], "master-3")]